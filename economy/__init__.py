@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-import random
+from bisect import bisect_right
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import accumulate
 from typing import Any, Dict, Optional, Tuple, List
 
+import numpy as np
 
-@dataclass
+
+@dataclass(slots=True)
 class Balances:
     seer: float
     mon: float
@@ -13,7 +17,19 @@ class Balances:
 
 
 def _clamp(x: float, lo: float, hi: float) -> float:
-    return max(lo, min(hi, x))
+    # Conditional expression instead of max(lo, min(hi, x)): no builtin calls
+    return lo if x < lo else (hi if x > hi else x)
+
+
+def _rounded(values: Dict[str, float], nd: int = 8) -> Dict[str, float]:
+    # Round a block of output fields in one pass (keeps insertion order)
+    return {k: round(v, nd) for k, v in values.items()}
+
+
+def _add_stat(stats: Dict[str, Any], key: str, delta: float) -> None:
+    # Zero deltas (no sale, reserve-blocked buyback) skip the dict round-trip
+    if delta:
+        stats[key] = float(stats.get(key, 0.0)) + delta
 
 
 def get_mock_seer_price_mon(state: Dict[str, Any], *, default_price: float = 1.0) -> float:
@@ -25,7 +41,42 @@ def get_mock_seer_price_mon(state: Dict[str, Any], *, default_price: float = 1.0
     return max(1e-9, p)
 
 
-def ensure_economy_state(memory: Dict[str, Any]) -> None:
+class EconomyView:
+    """
+    Resolved references into memory["economy"] so public calls skip the nested dict walks.
+    Kept in a module-level slot (not on memory) so memory stays JSON-serializable.
+    """
+    __slots__ = ("memory", "eco", "balances", "params", "stats")
+
+    def __init__(self, memory: Dict[str, Any], eco: Dict[str, Any]) -> None:
+        self.memory = memory
+        self.eco = eco
+        self.balances = eco["balances"]
+        self.params = eco["params"]
+        self.stats = eco["stats"]
+
+    def is_current(self, memory: Dict[str, Any]) -> bool:
+        # Identity checks only: callers may swap any of these dicts out wholesale
+        eco = self.eco
+        return (
+            self.memory is memory
+            and memory.get("economy") is eco
+            and eco.get("balances") is self.balances
+            and eco.get("params") is self.params
+            and eco.get("stats") is self.stats
+        )
+
+
+# Single-entry cache: the agent works on one memory dict per run
+_VIEW: Optional[EconomyView] = None
+
+
+def ensure_economy_state(memory: Dict[str, Any]) -> EconomyView:
+    global _VIEW
+    view = _VIEW
+    if view is not None and view.is_current(memory):
+        return view
+
     eco = memory.setdefault("economy", {})
     eco.setdefault("balances", {"seer": 0.0, "mon": 0.0, "seer_burned": 0.0})
     eco.setdefault("treasury_mon", 0.0)
@@ -50,9 +101,16 @@ def ensure_economy_state(memory: Dict[str, Any]) -> None:
     )
     eco.setdefault("seer_price_mon", 1.0)
 
+    view = _VIEW = EconomyView(memory, eco)
+    return view
+
 
 def read_balances(memory: Dict[str, Any]) -> Balances:
-    b = (memory.get("economy", {}) or {}).get("balances", {}) or {}
+    view = _VIEW
+    if view is not None and view.is_current(memory):
+        b = view.balances
+    else:
+        b = (memory.get("economy", {}) or {}).get("balances", {}) or {}
     return Balances(
         seer=float(b.get("seer", 0.0) or 0.0),
         mon=float(b.get("mon", 0.0) or 0.0),
@@ -61,16 +119,16 @@ def read_balances(memory: Dict[str, Any]) -> Balances:
 
 
 def write_balances(memory: Dict[str, Any], bal: Balances) -> None:
-    memory["economy"]["balances"] = {
-        "seer": round(bal.seer, 8),
-        "mon": round(bal.mon, 8),
-        "seer_burned": round(bal.seer_burned, 8),
-    }
+    b = _rounded({"seer": bal.seer, "mon": bal.mon, "seer_burned": bal.seer_burned})
+    memory["economy"]["balances"] = b
+    view = _VIEW
+    if view is not None and view.memory is memory:
+        view.balances = b
 
 
 def can_launch(memory: Dict[str, Any]) -> Tuple[bool, str]:
-    ensure_economy_state(memory)
-    params = memory["economy"]["params"]
+    view = ensure_economy_state(memory)
+    params = view.params
     bal = read_balances(memory)
     min_live = float(params.get("min_seer_to_live", 1.0))
     if bal.seer < min_live:
@@ -79,9 +137,9 @@ def can_launch(memory: Dict[str, Any]) -> Tuple[bool, str]:
 
 
 def fund_launch_by_selling_seer(memory: Dict[str, Any], bucket: str = "neutral", edge: float = 0.0) -> Dict[str, Any]:
-    ensure_economy_state(memory)
-    eco = memory["economy"]
-    params = eco["params"]
+    view = ensure_economy_state(memory)
+    eco = view.eco
+    params = view.params
     bal = read_balances(memory)
 
     price = get_mock_seer_price_mon(eco)
@@ -116,7 +174,7 @@ def fund_launch_by_selling_seer(memory: Dict[str, Any], bucket: str = "neutral",
     bal.mon += got_mon
     
     # Update stats
-    eco["stats"]["seer_sold_total"] = float(eco["stats"].get("seer_sold_total", 0.0)) + sold_seer
+    _add_stat(view.stats, "seer_sold_total", sold_seer)
 
     write_balances(memory, bal)
 
@@ -132,8 +190,7 @@ def fund_launch_by_selling_seer(memory: Dict[str, Any], bucket: str = "neutral",
 
 
 def spend_mon_for_launch(memory: Dict[str, Any]) -> Dict[str, Any]:
-    ensure_economy_state(memory)
-    params = memory["economy"]["params"]
+    params = ensure_economy_state(memory).params
     bal = read_balances(memory)
 
     mon_needed = float(params.get("mon_per_launch", 5.0))
@@ -150,6 +207,24 @@ def spend_mon_for_launch(memory: Dict[str, Any]) -> Dict[str, Any]:
 # Simulation Logic: Mode-Based + Edge-Based + Calibrated
 # -------------------------------------------------------------------------
 
+# Fixed outcome order used by the vectorized simulator (index == outcome id)
+OUTCOMES = ("RUG", "FLOP", "BREAKEVEN", "PUMP", "MOON")
+_RUG, _FLOP, _BREAKEVEN, _PUMP, _MOON = range(len(OUTCOMES))
+_OUTCOME_IDX = {name: i for i, name in enumerate(OUTCOMES)}
+
+# Multiplier shape only distinguishes conservative / aggressive / everything else
+_MODE_CONSERVATIVE, _MODE_AGGRESSIVE, _MODE_OTHER = 0, 1, 2
+_MODE_CLASS = {"conservative": _MODE_CONSERVATIVE, "aggressive": _MODE_AGGRESSIVE}
+
+# NumPy Generator (Ziggurat normals) backs every multiplier draw
+_RNG = np.random.default_rng()
+
+
+def seed_rng(seed: Optional[int]) -> None:
+    """Re-seed the module-level simulation RNG (replaces random.seed)."""
+    global _RNG
+    _RNG = np.random.default_rng(seed)
+
 OUTCOME_PROBABILITIES = {
     "conservative": {
         "RUG": 0.02,        # Lower rug chance
@@ -195,6 +270,12 @@ OUTCOME_PROBABILITIES = {
     },
 }
 
+# OUTCOME_PROBABILITIES as fixed-order rows (OUTCOMES order) for _apply_edge
+_PROB_ROWS = {
+    mode: tuple(probs[k] for k in OUTCOMES)
+    for mode, probs in OUTCOME_PROBABILITIES.items()
+}
+
 MODE_SENSITIVITY = {
     "conservative": 0.2,
     "balanced": 0.8,
@@ -205,143 +286,143 @@ MODE_SENSITIVITY = {
 }
 
 
-def sample_multiplier(outcome: str, mode: str, edge: float) -> float:
+# Multiplier distribution per (outcome, mode class). Balanced targets: PUMP avg ~1.5,
+# MOON avg ~5.0 - 6.0 (lognormal mean = exp(mu + sigma^2/2)); RUG is always 0.0.
+_UNIF_PARAMS: Dict[Tuple[int, int], Tuple[float, float]] = {
+    # BREAKEVEN: almost always 1.0 +/- small noise
+    (_BREAKEVEN, _MODE_CONSERVATIVE): (0.9, 1.1),
+    (_BREAKEVEN, _MODE_AGGRESSIVE): (0.9, 1.1),
+    (_BREAKEVEN, _MODE_OTHER): (0.9, 1.1),
+    # FLOP: conservative softer, aggressive harder, balanced in between
+    (_FLOP, _MODE_CONSERVATIVE): (0.5, 0.9),
+    (_FLOP, _MODE_AGGRESSIVE): (0.01, 0.5),
+    (_FLOP, _MODE_OTHER): (0.3, 0.7),
+    # Conservative PUMP: modest returns
+    (_PUMP, _MODE_CONSERVATIVE): (1.1, 1.8),
+}
+
+# (mu, sigma, lo, hi): lognormal draw clamped to [lo, hi]
+_LN_PARAMS: Dict[Tuple[int, int], Tuple[float, float, float, float]] = {
+    (_PUMP, _MODE_AGGRESSIVE): (0.7, 0.4, 1.1, 8.0),     # volatile pumps, median 2.0
+    (_PUMP, _MODE_OTHER): (0.35, 0.3, 1.1, 4.0),         # median ~1.4
+    (_MOON, _MODE_AGGRESSIVE): (1.8, 0.6, 3.0, 50.0),    # huge moons, median 6.0, cap 50x
+    (_MOON, _MODE_OTHER): (1.5, 0.5, 3.0, 15.0),         # median 4.5
+}
+
+_CONST_MULT: Dict[Tuple[int, int], float] = {
+    # Conservative MOON has prob 0; safe fallback
+    (_MOON, _MODE_CONSERVATIVE): 2.0,
+}
+
+
+def _sample_multiplier_idx(outcome_i: int, mode_i: int, rng: np.random.Generator) -> float:
+    """
+    Scalar kernel behind sample_multiplier: one table lookup and at most one draw.
+    """
+    key = (outcome_i, mode_i)
+    p = _UNIF_PARAMS.get(key)
+    if p is not None:
+        return rng.uniform(p[0], p[1])
+    q = _LN_PARAMS.get(key)
+    if q is not None:
+        return _clamp(rng.lognormal(q[0], q[1]), q[2], q[3])
+    return _CONST_MULT.get(key, 0.0)
+
+
+def sample_multiplier(outcome: str, mode: str, edge: float, rng: Optional[np.random.Generator] = None) -> float:
     """
     Sample a multiplier based on outcome, shaped by mode and edge.
     Calibrated for Balanced EV ~ 1.0 (0% ROI) at edge 0.0.
     """
-    # Simple logic: positive edge slightly boosts PUMP/MOON magnitude, negative hurts it
     # Mode determines the volatility/range.
-    
-    if outcome == "RUG":
+    outcome_i = _OUTCOME_IDX.get(outcome)
+    if outcome_i is None:
         return 0.0
+    return _sample_multiplier_idx(outcome_i, _MODE_CLASS.get(mode, _MODE_OTHER), rng if rng is not None else _RNG)
 
-    elif outcome == "BREAKEVEN":
-        # Almost always 1.0 +/- small noise
-        # Aggressive might be slightly wider spreads
-        return random.uniform(0.9, 1.1)
-
-    elif outcome == "FLOP":
-        # Conservative: softer flops (0.5 - 0.9)
-        # Aggressive: harder flops (0.01 - 0.4)
-        if mode == "conservative":
-            return random.uniform(0.5, 0.9)
-        elif mode == "aggressive":
-            return random.uniform(0.01, 0.5)
+
+def _apply_edge(row: Tuple[float, ...], edge: float, sensitivity: float) -> Tuple[float, ...]:
+    """
+    Shift probability mass between bad (RUG, FLOP) and good (PUMP, MOON) outcomes.
+    Operates on a probability row in OUTCOMES order and returns a new normalized row.
+    """
+    # sensitivity always comes from MODE_SENSITIVITY, which is within [0, 2]
+    edge = -1.0 if edge < -1.0 else (1.0 if edge > 1.0 else edge)
+    rug, flop, breakeven, pump, moon = row
+
+    # +1 moves mass bad (RUG, FLOP) -> good (PUMP, MOON), -1 the reverse
+    sign = (edge > 0) - (edge < 0)
+    if sign:
+        if sign > 0:
+            src1, src2, dst1, dst2 = rug, flop, pump, moon
         else:
-            # Balanced
-            return random.uniform(0.3, 0.7)
-
-    elif outcome == "PUMP":
-        # Fat tails?
-        # Balanced Target Avg ~1.5
-        # Lognormal guide: Mean = exp(mu + sigma^2/2)
-        # Try Triangular for simpler bounded control or Lognorm for tails. 
-        # User asked for tails.
-        
-        if mode == "conservative":
-            # Modest returns: 1.1 to 1.8
-            return random.uniform(1.1, 1.8)
-        
-        elif mode == "aggressive":
-            # Volatile pumps: 1.2 to 5.0+
-            # Lognorm. Median 2.0.
-            val = random.lognormvariate(0.7, 0.4) 
-            return _clamp(val, 1.1, 8.0)
-            
+            src1, src2, dst1, dst2 = pump, moon, rug, flop
+
+        src_mass = src1 + src2
+        dst_mass = dst1 + dst2
+
+        # Approx 30-40% mass shift max
+        actual_transfer = min(abs(edge) * sensitivity * 0.4, src_mass)
+        if src_mass > 0:
+            src1 -= actual_transfer * (src1 / src_mass)
+            src2 -= actual_transfer * (src2 / src_mass)
+        if dst_mass > 0:
+            dst1 += actual_transfer * (dst1 / dst_mass)
+            dst2 += actual_transfer * (dst2 / dst_mass)
         else:
-            # Balanced: Target avg 1.5
-            # Median ~1.4
-            val = random.lognormvariate(0.35, 0.3) 
-            return _clamp(val, 1.1, 4.0)
+            dst1 += actual_transfer / 2
+            dst2 += actual_transfer / 2
 
-    elif outcome == "MOON":
-        # Balanced Target Avg ~5.0 - 6.0
-        
-        if mode == "conservative":
-             # Should not happen prob=0, but safe fallback
-             return 2.0
-        
-        if mode == "aggressive":
-            # Huge moons possible
-            # Median 6.0
-            val = random.lognormvariate(1.8, 0.6)
-            return _clamp(val, 3.0, 50.0) # Cap at 50x
-            
+        if sign > 0:
+            rug, flop, pump, moon = src1, src2, dst1, dst2
         else:
-            # Balanced
-            # Median 4.5
-            val = random.lognormvariate(1.5, 0.5)
-            return _clamp(val, 3.0, 15.0)
+            pump, moon, rug, flop = src1, src2, dst1, dst2
 
-    return 0.0
+    total = rug + flop + breakeven + pump + moon
+    if total <= 0:
+        return row
 
+    return (rug / total, flop / total, breakeven / total, pump / total, moon / total)
 
-def _apply_edge(probs: Dict[str, float], edge: float, sensitivity: float) -> Dict[str, float]:
-    edge = _clamp(edge, -1.0, 1.0)
-    sensitivity = _clamp(sensitivity, 0.0, 2.0)
-    p = probs.copy()
-    
-    # Approx 30-40% mass shift max
-    transfer_amount = abs(edge) * sensitivity * 0.4
-    
-    bad_outcomes = ["RUG", "FLOP"]
-    good_outcomes = ["PUMP", "MOON"]
-    
-    bad_mass = sum(p[k] for k in bad_outcomes)
-    good_mass = sum(p[k] for k in good_outcomes)
-    
-    if edge > 0:
-        actual_transfer = min(transfer_amount, bad_mass)
-        if bad_mass > 0:
-            for k in bad_outcomes:
-                p[k] -= actual_transfer * (p[k] / bad_mass)
-        if good_mass > 0:
-            for k in good_outcomes:
-                p[k] += actual_transfer * (p[k] / good_mass)
-        else:
-            for k in good_outcomes:
-                p[k] += actual_transfer / len(good_outcomes)
-                
-    elif edge < 0:
-        actual_transfer = min(transfer_amount, good_mass)
-        if good_mass > 0:
-            for k in good_outcomes:
-                p[k] -= actual_transfer * (p[k] / good_mass)
-        if bad_mass > 0:
-            for k in bad_outcomes:
-                p[k] += actual_transfer * (p[k] / bad_mass)
-        else:
-            for k in bad_outcomes:
-                p[k] += actual_transfer / len(bad_outcomes)
 
-    total = sum(p.values())
-    if total <= 0:
-        return probs.copy()
-        
-    for k in p:
-        p[k] /= total
-        
-    return p
+@lru_cache(maxsize=4096)
+def _edge_row(mode: str, edge: float) -> Tuple[float, ...]:
+    """
+    Edge-adjusted probability row for (mode, edge). Deterministic, so memoized.
+    Keyed on the exact edge rather than a quantized bin to keep results unchanged.
+    """
+    base_row = _PROB_ROWS.get(mode, _PROB_ROWS["default"])
+    sensitivity = MODE_SENSITIVITY.get(mode, MODE_SENSITIVITY["default"])
+    return _apply_edge(base_row, edge, sensitivity)
+
+
+@lru_cache(maxsize=4096)
+def _edge_cdf(mode: str, edge: float) -> Tuple[float, ...]:
+    """
+    Normalized cumulative weights of _edge_row, built the same way Generator.choice
+    does (cumsum / last) so bisecting one uniform draw picks the identical outcome.
+    """
+    cum = tuple(accumulate(_edge_row(mode, edge)))
+    return tuple(c / cum[-1] for c in cum)
+
+
+@lru_cache(maxsize=4096)
+def _edge_probs_rounded(mode: str, edge: float) -> Tuple[float, ...]:
+    # Rounded row for the returned "probs" payload; same key as _edge_row
+    return tuple(round(v, 4) for v in _edge_row(mode, edge))
 
 
 def simulate_meme_outcome(memory: Dict[str, Any], mode: str = "balanced", edge: float = 0.0, *, rng_seed: Optional[int] = None) -> Dict[str, Any]:
-    ensure_economy_state(memory)
-    params = memory["economy"]["params"]
-    if rng_seed is not None:
-        random.seed(rng_seed)
+    params = ensure_economy_state(memory).params
+    # Seeded calls get their own Generator so they never disturb the shared _RNG
+    rng = np.random.default_rng(rng_seed) if rng_seed is not None else _RNG
 
     stake = float(params.get("mon_per_launch", 5.0))
     
-    base_probs = OUTCOME_PROBABILITIES.get(mode, OUTCOME_PROBABILITIES["default"])
-    sensitivity = MODE_SENSITIVITY.get(mode, MODE_SENSITIVITY["default"])
-    final_probs = _apply_edge(base_probs, edge, sensitivity)
-    
-    outcomes_list = list(final_probs.keys())
-    weights_list = list(final_probs.values())
-    outcome_type = random.choices(outcomes_list, weights=weights_list, k=1)[0]
+    outcome_i = bisect_right(_edge_cdf(mode, edge), rng.random())
+    outcome_type = OUTCOMES[outcome_i]
     
-    multiplier = sample_multiplier(outcome_type, mode, edge)
+    multiplier = _sample_multiplier_idx(outcome_i, _MODE_CLASS.get(mode, _MODE_OTHER), rng)
     payout = stake * multiplier
     
     if payout < 0:
@@ -352,20 +433,85 @@ def simulate_meme_outcome(memory: Dict[str, Any], mode: str = "balanced", edge:
         "outcome": outcome_type,
         "mode": mode, 
         "edge": edge,
-        "probs": {k: round(v, 4) for k, v in final_probs.items()},
+        "probs": dict(zip(OUTCOMES, _edge_probs_rounded(mode, edge))),
         "multiplier": round(multiplier, 4),
         "note": "simulated_calibrated"
     }
 
 
+def _sample_multipliers(outcomes: np.ndarray, mode: str, rng: np.random.Generator) -> np.ndarray:
+    """
+    Vectorized sample_multiplier: one draw per outcome class, filled through masks.
+    Distributions and clamps mirror sample_multiplier exactly.
+    """
+    mult = np.zeros(outcomes.shape[0])  # RUG -> 0.0
+
+    def fill(outcome_idx: int, draw) -> None:
+        mask = outcomes == outcome_idx
+        k = int(mask.sum())
+        if k:
+            mult[mask] = draw(k)
+
+    mode_i = _MODE_CLASS.get(mode, _MODE_OTHER)
+
+    # Fill order is fixed so seeded batches stay reproducible
+    for outcome_i in (_BREAKEVEN, _FLOP, _PUMP, _MOON):
+        key = (outcome_i, mode_i)
+        p = _UNIF_PARAMS.get(key)
+        q = _LN_PARAMS.get(key)
+        if p is not None:
+            fill(outcome_i, lambda k: rng.uniform(p[0], p[1], k))
+        elif q is not None:
+            fill(outcome_i, lambda k: np.clip(rng.lognormal(q[0], q[1], k), q[2], q[3]))
+        else:
+            c = _CONST_MULT.get(key, 0.0)
+            fill(outcome_i, lambda k: np.full(k, c))
+
+    return mult
+
+
+def simulate_meme_outcome_batch(memory: Dict[str, Any], mode: str = "balanced", edge: float = 0.0, n: int = 1000, *, rng_seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Batch variant of simulate_meme_outcome for EV calibration and edge/mode sweeps.
+    Draws all n outcomes and multipliers with NumPy in one shot.
+    Arrays are returned unrounded; balances are not touched.
+    """
+    params = ensure_economy_state(memory).params
+    rng = np.random.default_rng(rng_seed) if rng_seed is not None else _RNG
+    n = max(0, int(n))
+
+    stake = float(params.get("mon_per_launch", 5.0))
+
+    weights = np.array(_edge_row(mode, edge))
+    outcomes = rng.choice(len(OUTCOMES), size=n, p=weights / weights.sum())
+    multipliers = _sample_multipliers(outcomes, mode, rng)
+    payouts = stake * multipliers
+
+    counts = np.bincount(outcomes, minlength=len(OUTCOMES))
+
+    return {
+        "payout_mon": payouts,
+        "outcome_idx": outcomes,
+        "multiplier": multipliers,
+        "n": n,
+        "mode": mode,
+        "edge": edge,
+        "probs": dict(zip(OUTCOMES, _edge_probs_rounded(mode, edge))),
+        "outcome_counts": {k: int(c) for k, c in zip(OUTCOMES, counts)},
+        "mean_multiplier": float(multipliers.mean()) if n else 0.0,
+        "mean_payout_mon": float(payouts.mean()) if n else 0.0,
+        "note": "simulated_calibrated_batch",
+    }
+
+
 def apply_flywheel(memory: Dict[str, Any], payout_mon: float, stake_mon: float, buyback_pct: float, burn_pct: float) -> Dict[str, Any]:
     """
     Apply CORE flywheel: treasury from profit, buyback/burn from remaining profit.
     Only operates on profit (payout - stake), protects operating reserve.
     """
-    ensure_economy_state(memory)
-    eco = memory["economy"]
-    params = eco["params"]
+    view = ensure_economy_state(memory)
+    eco = view.eco
+    params = view.params
     bal = read_balances(memory)
     price = get_mock_seer_price_mon(eco)
 
@@ -379,59 +525,67 @@ def apply_flywheel(memory: Dict[str, Any], payout_mon: float, stake_mon: float,
     # Calculate profit
     profit = max(0.0, payout_mon - stake_mon)
     
-    # Treasury take from profit
-    treasury_pct = _clamp(float(params.get("treasury_pct_of_profit", 0.30)), 0.0, 1.0)
-    treasury_take = profit * treasury_pct
-    
-    # Remaining profit for buyback
-    profit_after_treasury = profit - treasury_take
-    
     buyback_pct = _clamp(float(buyback_pct), 0.0, 1.0)
-    burn_pct = _clamp(float(burn_pct), 0.0, 0.05)
-    
-    # Buyback budget from remaining profit
-    buyback_budget_raw = profit_after_treasury * buyback_pct
     
-    # Protect operating reserve
-    min_operating = float(params.get("min_operating_mon", 5.0))
-    operating_mon = bal.mon
-    max_buyback = max(0.0, operating_mon - min_operating)
-    buyback_budget = min(buyback_budget_raw, max_buyback)
-    
-    # Execute buyback
-    bought_seer = 0.0
-    
-    if buyback_budget > 0 and price > 0:
-        bought_seer = buyback_budget / price
-        bal.mon -= buyback_budget
-        bal.seer += bought_seer
-    
-    # Update treasury
-    eco["treasury_mon"] = float(eco.get("treasury_mon", 0.0)) + treasury_take
-    
-    # Update cumulative stats
-    stats = eco["stats"]
-    stats["buyback_mon_total"] = float(stats.get("buyback_mon_total", 0.0)) + buyback_budget
-    stats["seer_bought_total"] = float(stats.get("seer_bought_total", 0.0)) + bought_seer
-    
-    write_balances(memory, bal)
-
-    return {
-        "payout_mon": round(payout_mon, 8),
-        "stake_mon": round(stake_mon, 8),
-        "profit": round(profit, 8),
-        "treasury_take": round(treasury_take, 8),
-        "profit_after_treasury": round(profit_after_treasury, 8),
-        "buyback_budget_raw": round(buyback_budget_raw, 8),
-        "buyback_budget": round(buyback_budget, 8),
-        "bought_seer": round(bought_seer, 8),
-        "mon_before": round(mon_before, 8),
-        "mon_after": round(bal.mon, 8),
-        "seer_price_mon": price,
-        "buyback_pct": buyback_pct,
-        "treasury_mon": round(eco["treasury_mon"], 8),
-        "balances": memory["economy"]["balances"],
-    }
+    # No profit (the common RUG/FLOP case): no treasury take, no buyback,
+    # only the payout (if any) is credited
+    if profit == 0.0:
+        treasury_take = profit_after_treasury = 0.0
+        buyback_budget_raw = buyback_budget = bought_seer = 0.0
+        if payout_mon > 0.0:
+            write_balances(memory, bal)
+    else:
+        # Treasury take from profit
+        treasury_pct = _clamp(float(params.get("treasury_pct_of_profit", 0.30)), 0.0, 1.0)
+        treasury_take = profit * treasury_pct
+        
+        # Remaining profit for buyback
+        profit_after_treasury = profit - treasury_take
+        
+        # Buyback budget from remaining profit
+        buyback_budget_raw = profit_after_treasury * buyback_pct
+        
+        # Protect operating reserve
+        min_operating = float(params.get("min_operating_mon", 5.0))
+        operating_mon = bal.mon
+        max_buyback = max(0.0, operating_mon - min_operating)
+        buyback_budget = min(buyback_budget_raw, max_buyback)
+        
+        # Execute buyback
+        bought_seer = 0.0
+        
+        if buyback_budget > 0 and price > 0:
+            bought_seer = buyback_budget / price
+            bal.mon -= buyback_budget
+            bal.seer += bought_seer
+        
+        # Update treasury
+        eco["treasury_mon"] = float(eco.get("treasury_mon", 0.0)) + treasury_take
+        
+        # Update cumulative stats
+        stats = view.stats
+        _add_stat(stats, "buyback_mon_total", buyback_budget)
+        _add_stat(stats, "seer_bought_total", bought_seer)
+        
+        write_balances(memory, bal)
+
+    out = _rounded({
+        "payout_mon": payout_mon,
+        "stake_mon": stake_mon,
+        "profit": profit,
+        "treasury_take": treasury_take,
+        "profit_after_treasury": profit_after_treasury,
+        "buyback_budget_raw": buyback_budget_raw,
+        "buyback_budget": buyback_budget,
+        "bought_seer": bought_seer,
+        "mon_before": mon_before,
+        "mon_after": bal.mon,
+    })
+    out["seer_price_mon"] = price
+    out["buyback_pct"] = buyback_pct
+    out["treasury_mon"] = round(float(eco.get("treasury_mon", 0.0)), 8)
+    out["balances"] = eco["balances"]
+    return out
 
 
 # Legacy wrapper for compatibility
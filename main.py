@@ -1,12 +1,27 @@
 from __future__ import annotations
 
 import os
+import re
 import json
 import time
 import copy
+import functools
+import threading
+from concurrent.futures import Future
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
+try:
+    import orjson  # optional: faster parsing of LLM / feed payloads
+except ImportError:
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
 from economy import (
     ensure_economy_state,
     can_launch,
@@ -26,11 +41,9 @@ from policy import (
     update_bandit,
 )
 from social_ritual import prepare_ritual_post
-import asyncio
-from web3 import Web3
-from onchain.nadfun_executor import NadfunExecutor
-from scripts.generate_token_image import generate_token_image as generate_image
 from portfolio import manage_portfolio, get_blocking_positions
+# onchain (web3) and the image generator (PIL) are imported where used:
+# most runs exit at a gate before touching either.
 
 AGENT_NAME = "MemeSeer"
 
@@ -39,12 +52,36 @@ MAX_ACTIVE_POSITIONS = 3
 MEMORY_PATH = os.getenv("MEMESEER_MEMORY_PATH", "memory.json")
 OUTBOX_DIR = os.getenv("MEMESEER_OUTBOX_DIR", "outbox")
 RITUAL_COOLDOWN_SECONDS = int(os.getenv("MEMESEER_RITUAL_COOLDOWN_SECONDS", str(6 * 60 * 60)))
+# Overlap generate_token_idea with decide (costs one wasted LLM call on no-launch runs)
+SPECULATIVE_TOKEN_IDEA = os.getenv("MEMESEER_SPECULATIVE_IDEA", "0") == "1"
+# One combined think/decide/token-idea prompt instead of three sequential calls
+FUSED_LLM = os.getenv("MEMESEER_FUSED_LLM", "0") == "1"
 
 DEFAULT_SEER_INITIAL = float(os.getenv("SEER_INITIAL", "1000"))
 DEFAULT_SEER_PRICE_MON = float(os.getenv("SEER_PRICE_MON", "1.0"))
 DEFAULT_MON_PER_LAUNCH = float(os.getenv("MON_PER_LAUNCH", "5.0"))
 DEFAULT_MAX_SEER_SELL_FRAC = float(os.getenv("MAX_SEER_SELL_FRAC", "0.25"))
 
+# Hot-path env switches, read once per process (see reload_env)
+DISABLE_LLM = False
+MAX_EVENTS = 500
+FAST_SAVE = False
+OPENROUTER_API_KEY = ""
+OPENROUTER_MODEL = "gpt-4o-mini"
+
+
+def reload_env() -> None:
+    """Re-read the env switches above (e.g. after changing os.environ)."""
+    global DISABLE_LLM, MAX_EVENTS, FAST_SAVE, OPENROUTER_API_KEY, OPENROUTER_MODEL
+    DISABLE_LLM = os.getenv("MEMESEER_DISABLE_LLM") == "1"
+    MAX_EVENTS = int(os.getenv("MEMESEER_MAX_EVENTS", "500"))
+    FAST_SAVE = os.getenv("MEMESEER_FAST_SAVE") == "1"
+    OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY", "")
+    OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "gpt-4o-mini")
+
+
+reload_env()
+
 SEER_TOKEN_ADDRESS = os.getenv("SEER_TOKEN_ADDRESS")
 if not SEER_TOKEN_ADDRESS:
     raise Exception("SEER_TOKEN_ADDRESS not configured")
@@ -54,12 +91,45 @@ if not SEER_TOKEN_ADDRESS:
 # ----------------
 def get_openrouter_key() -> str:
     """Get OpenRouter API key from environment."""
-    return os.getenv("OPENROUTER_API_KEY", "")
+    return OPENROUTER_API_KEY
 
 
 def get_openrouter_model() -> str:
     """Get OpenRouter model from environment, default to gpt-4o-mini."""
-    return os.getenv("OPENROUTER_MODEL", "gpt-4o-mini")
+    return OPENROUTER_MODEL
+
+
+_OPENROUTER_SESSION = None
+
+
+def _speculate(fn, *args) -> Future:
+    """
+    Run fn(*args) on a daemon thread and return its Future. Not a ThreadPoolExecutor:
+    pool workers are joined at exit, so a speculative call whose result is thrown
+    away would hold the process open until the LLM request finished.
+    """
+    future: Future = Future()
+
+    def run() -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="memeseer-llm", daemon=True).start()
+    return future
+
+
+def _openrouter_session():
+    """Shared keep-alive session so each LLM call skips the TCP/TLS handshake."""
+    global _OPENROUTER_SESSION
+    if _OPENROUTER_SESSION is None:
+        import requests
+
+        _OPENROUTER_SESSION = requests.Session()
+    return _OPENROUTER_SESSION
 
 
 def openrouter_chat(messages: list[dict], model: str, api_key: str, timeout_sec: int = 60) -> str:
@@ -68,9 +138,8 @@ def openrouter_chat(messages: list[dict], model: str, api_key: str, timeout_sec:
     Returns assistant message content.
     Raises RuntimeError on non-200 status.
     """
-    import urllib.request
-    import urllib.error
-    
+    import requests
+
     url = "https://openrouter.ai/api/v1/chat/completions"
     
     body = {
@@ -86,29 +155,41 @@ def openrouter_chat(messages: list[dict], model: str, api_key: str, timeout_sec:
         "X-Title": "MemeSeer"
     }
     
-    data = json.dumps(body).encode('utf-8')
-    req = urllib.request.Request(url, data=data, headers=headers)
+    data = orjson.dumps(body) if orjson else json.dumps(body).encode('utf-8')
     
     try:
-        with urllib.request.urlopen(req, timeout=timeout_sec) as response:
-            resp_data = json.loads(response.read().decode('utf-8'))
-            return resp_data["choices"][0]["message"]["content"]
-    except urllib.error.HTTPError as e:
-        body_snippet = ""
-        try:
-            body_snippet = e.read().decode('utf-8')[:200]
-        except:
-            pass
-        raise RuntimeError(f"OpenRouter HTTP {e.code}: {body_snippet}")
-    except urllib.error.URLError as e:
-        raise RuntimeError(f"OpenRouter URL error: {e.reason}")
-    except (KeyError, IndexError, json.JSONDecodeError) as e:
+        response = _openrouter_session().post(url, data=data, headers=headers, timeout=timeout_sec)
+    except requests.RequestException as e:
+        raise RuntimeError(f"OpenRouter URL error: {e}")
+
+    if response.status_code != 200:
+        snippet = response.content[:200].decode("utf-8", errors="replace")
+        raise RuntimeError(f"OpenRouter HTTP {response.status_code}: {snippet}")
+
+    try:
+        resp_data = _json_loads(response.content)
+        return resp_data["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError, ValueError) as e:
         raise RuntimeError(f"OpenRouter response parse error: {e}")
 
 
 # ----------------
 # JSON helpers
 # ----------------
+def _json_loads(data):
+    """
+    json.loads via orjson when installed (accepts bytes, no decode step).
+    Only for LLM/feed payloads: memory.json stays on stdlib json because raw token
+    amounts exceed orjson's 64-bit integer range.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
 def extract_first_json_object(text: str) -> Optional[Dict[str, Any]]:
     if not text or not isinstance(text, str):
         return None
@@ -116,43 +197,22 @@ def extract_first_json_object(text: str) -> Optional[Dict[str, Any]]:
 
     # Fast path
     try:
-        obj = json.loads(text)
+        obj = _json_loads(text)
         return obj if isinstance(obj, dict) else None
     except Exception:
         pass
 
+    # Slow path: let the C decoder consume the top-level object starting at the
+    # first "{". If that object is malformed, give up (no retry at later or
+    # nested "{"), same as matching its braces and parsing the span.
     start = text.find("{")
     if start == -1:
         return None
-
-    depth = 0
-    in_str = False
-    esc = False
-
-    for i in range(start, len(text)):
-        ch = text[i]
-        if in_str:
-            if esc:
-                esc = False
-            elif ch == "\\":
-                esc = True
-            elif ch == '"':
-                in_str = False
-        else:
-            if ch == '"':
-                in_str = True
-            elif ch == "{":
-                depth += 1
-            elif ch == "}":
-                depth -= 1
-                if depth == 0:
-                    chunk = text[start : i + 1]
-                    try:
-                        obj = json.loads(chunk)
-                        return obj if isinstance(obj, dict) else None
-                    except Exception:
-                        return None
-    return None
+    try:
+        obj, _ = _JSON_DECODER.raw_decode(text, start)
+    except ValueError:
+        return None
+    return obj if isinstance(obj, dict) else None
 
 
 # ----------------
@@ -162,8 +222,27 @@ def utc_now_ts() -> int:
     return int(time.time())
 
 
+# [epoch second, local ISO, UTC ISO]: both strings only change once per second
+_ISO_CACHE = [-1, "", ""]
+
+
+def _iso_cache() -> list:
+    now = int(time.time())
+    if now != _ISO_CACHE[0]:
+        _ISO_CACHE[:] = [
+            now,
+            datetime.fromtimestamp(now).isoformat(timespec="seconds"),
+            datetime.fromtimestamp(now, timezone.utc).isoformat(timespec="seconds"),
+        ]
+    return _ISO_CACHE
+
+
 def utc_now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+    return _iso_cache()[2]
+
+
+def local_now_iso() -> str:
+    return _iso_cache()[1]
 
 
 # ----------------
@@ -173,18 +252,87 @@ def load_memory(path: str = MEMORY_PATH) -> Dict[str, Any]:
     if not os.path.exists(path):
         return {}
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            obj = json.load(f)
-        return obj if isinstance(obj, dict) else {}
+        # One read + one decode; skips TextIOWrapper's incremental decode/newline pass
+        with open(path, "rb") as f:
+            text = f.read().decode("utf-8")
+        obj = json.loads(text)
+        if not isinstance(obj, dict):
+            return {}
+        _SAVED_SNAPSHOTS[path] = text
+        return obj
     except Exception:
         return {}
 
 
+_MEMORY_ENCODER = json.JSONEncoder(indent=2, ensure_ascii=False, allow_nan=False)
+_fdatasync = getattr(os, "fdatasync", os.fsync)  # no fdatasync on macOS
+# Last snapshot written per path, so repeated saves within a run skip unchanged state.
+_SAVED_SNAPSHOTS: Dict[str, str] = {}
+
+
 def save_memory(memory: Dict[str, Any], path: str = MEMORY_PATH) -> None:
+    # Serialize once and write in a single call (json.dump issues one write per chunk).
+    text = _MEMORY_ENCODER.encode(memory)
+    if _SAVED_SNAPSHOTS.get(path) == text:
+        return
+    payload = memoryview(text.encode("utf-8"))
     tmp = path + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(memory, f, indent=2, ensure_ascii=False, allow_nan=False)
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        while payload:
+            payload = payload[os.write(fd, payload):]
+        # Data must hit disk before the rename, or a crash can leave an empty memory.json
+        if not FAST_SAVE:
+            _fdatasync(fd)
+    finally:
+        os.close(fd)
     os.replace(tmp, path)
+    _SAVED_SNAPSHOTS[path] = text
+
+
+def acquire_launch_lock(path: str = MEMORY_PATH) -> Optional[int]:
+    """
+    Non-blocking exclusive OS lock on <memory>.lock, held for the whole launch.
+    Returns the fd, or None if another run holds it. The kernel drops the lock if
+    the process dies, so a crashed launch cannot wedge future runs.
+    """
+    fd = os.open(path + ".lock", os.O_CREAT | os.O_RDWR, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def release_launch_lock(fd: int) -> None:
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+
+def record_launch_blocked(
+    memory: Dict[str, Any], reason: str, on_disk: Optional[Dict[str, Any]] = None, path: str = MEMORY_PATH
+) -> None:
+    """
+    Persist a launch_blocked event without clobbering a concurrent run. This run's copy
+    of memory.json may predate that run's launch (its launch_control, position and
+    events), so the event goes into the current on-disk state and that is saved instead.
+    """
+    if on_disk is None:
+        on_disk = load_memory(path)
+    if not on_disk:
+        on_disk = memory  # nothing (readable) on disk to preserve
+    on_disk.setdefault("events", [])
+    append_event(on_disk, {"type": "launch_blocked", "reason": reason})
+    save_memory(on_disk, path)
 
 
 def ensure_memory(memory: Dict[str, Any]) -> None:
@@ -198,8 +346,7 @@ def ensure_memory(memory: Dict[str, Any]) -> None:
     memory["social"].setdefault("last_ritual_post_ts", None)
     memory.setdefault("portfolio", {"active_positions": []})
     memory.setdefault("launch_control", {
-        "last_launch_timestamp": 0,
-        "launch_in_progress": False
+        "last_launch_timestamp": 0
     })
     memory.setdefault("core_guard", {
         "daily_core_sold": 0.0,
@@ -214,13 +361,12 @@ def ensure_memory(memory: Dict[str, Any]) -> None:
     })
 
 
-def append_event(memory: Dict[str, Any], event: Dict[str, Any]) -> None:
+def append_event(memory: Dict[str, Any], event: Dict[str, Any], ts: Optional[int] = None) -> None:
     event = dict(event)
-    event.setdefault("ts", utc_now_ts())
+    event.setdefault("ts", utc_now_ts() if ts is None else ts)
     memory["events"].append(event)
-    max_events = int(os.getenv("MEMESEER_MAX_EVENTS", "500"))
-    if len(memory["events"]) > max_events:
-        memory["events"] = memory["events"][-max_events:]
+    if len(memory["events"]) > MAX_EVENTS:
+        del memory["events"][:-MAX_EVENTS]  # trim in place, no new list
 
 
 def is_rate_limited(memory: Dict[str, Any]) -> bool:
@@ -230,16 +376,34 @@ def is_rate_limited(memory: Dict[str, Any]) -> bool:
     return (utc_now_ts() - last) < RITUAL_COOLDOWN_SECONDS
 
 
+# (launches dict, len when indexed, set of upper-cased tickers). Writers to
+# memory["launches"] call _invalidate_ticker_index(); the identity/length check
+# is only a fallback for writes that don't.
+_TICKER_INDEX = (None, -1, frozenset())
+
+
+def _invalidate_ticker_index() -> None:
+    global _TICKER_INDEX
+    _TICKER_INDEX = (None, -1, frozenset())
+
+
+def _launch_tickers(launches: Dict[str, Any]) -> frozenset:
+    global _TICKER_INDEX
+    indexed, count, tickers = _TICKER_INDEX
+    if indexed is not launches or count != len(launches):
+        tickers = frozenset(
+            str(((item or {}).get("token_idea") or {}).get("ticker", "")).strip().upper()
+            for item in launches.values()
+        )
+        _TICKER_INDEX = (launches, len(launches), tickers)
+    return tickers
+
+
 def duplicate_ticker(memory: Dict[str, Any], token_idea: Dict[str, Any]) -> bool:
     ticker = str(token_idea.get("ticker", "")).strip().upper()
     if not ticker:
         return True
-    launches = memory.get("launches") or {}
-    for _, item in launches.items():
-        tj = (item or {}).get("token_idea") or {}
-        if str(tj.get("ticker", "")).strip().upper() == ticker:
-            return True
-    return False
+    return ticker in _launch_tickers(memory.get("launches") or {})
 
 
 # Portfolio helpers
@@ -257,6 +421,29 @@ def get_active_position_count(memory: Dict[str, Any]) -> int:
 # ----------------
 # Agent cognition
 # ----------------
+_KEYWORDS = {
+    "trend": ["just in", "breaking", "new", "launch", "pump", "surge", "rally", "etf", "fed", "sec", "listing"],
+    "sentiment_pos": ["surge", "bull", "up", "win", "record", "approve", "moon"],
+    "sentiment_neg": ["down", "crash", "hack", "lawsuit", "ban", "rug", "scam", "bear"],
+    "novelty": ["new", "launch", "first", "now", "today", "breaking"],
+    "liquidity": ["volume", "liquidity", "dex", "cex", "listing", "order book"],
+    "competition": ["vs", "competition", "rival", "beats", "dominates", "market share"],
+}
+_ALL_KEYWORDS = sorted({kw for kws in _KEYWORDS.values() for kw in kws}, key=len, reverse=True)
+# Zero-width lookahead so overlapping hits are all seen in one pass; a keyword
+# shadowed by a longer one at the same offset is recovered via _KW_IMPLIES.
+_KEYWORD_RE = re.compile("(?=(" + "|".join(map(re.escape, _ALL_KEYWORDS)) + "))")
+_KW_IMPLIES = {kw: [k for k in _ALL_KEYWORDS if k in kw] for kw in _ALL_KEYWORDS}
+
+
+def _keyword_counts(text: str) -> Dict[str, int]:
+    """Per category, the number of its keywords that occur in text (substring match)."""
+    present = set()
+    for hit in {m.group(1) for m in _KEYWORD_RE.finditer(text)}:
+        present.update(_KW_IMPLIES[hit])
+    return {cat: sum(1 for kw in kws if kw in present) for cat, kws in _KEYWORDS.items()}
+
+
 # ----------------
 # Agent cognition
 # ----------------
@@ -264,6 +451,9 @@ def get_active_position_count(memory: Dict[str, Any]) -> int:
 # ----------------
 # Data loading
 # ----------------
+MAX_FEED_POSTS = 30
+
+
 def load_external_feed(path: str = "external_feed.json") -> Dict[str, Any]:
     """
     Loads external feed from JSON. 
@@ -274,15 +464,19 @@ def load_external_feed(path: str = "external_feed.json") -> Dict[str, Any]:
         return {"posts": [], "meta": {"source": "none", "status": "missing"}}
     
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        with open(path, "rb") as f:
+            data = _json_loads(f.read())
             
         posts = []
         meta = {"source": "unknown", "status": "ok", "updated_at": utc_now_iso()}
         
         if isinstance(data, list):
             # Format A: Simple list of strings
-            posts = [str(x)[:500] for x in data if x]
+            for x in data:
+                if x:
+                    posts.append(str(x)[:500])
+                    if len(posts) >= MAX_FEED_POSTS:
+                        break
             meta["source"] = "list"
         elif isinstance(data, dict):
             # Format B: Object with posts
@@ -295,12 +489,13 @@ def load_external_feed(path: str = "external_feed.json") -> Dict[str, Any]:
                             posts.append(text[:500])
                     elif isinstance(p, str):
                         posts.append(p[:500])
+                    if len(posts) >= MAX_FEED_POSTS:
+                        break
             meta["source"] = str(data.get("source", "dict"))
             if "updated_at" in data:
                 meta["updated_at"] = str(data["updated_at"])
                 
-        # Limit to 30 posts
-        return {"posts": posts[:30], "meta": meta}
+        return {"posts": posts, "meta": meta}
         
     except Exception as e:
         return {"posts": [], "meta": {"source": "error", "status": str(e)}}
@@ -328,7 +523,7 @@ def observe(memory: Dict[str, Any]) -> str:
     default_signals = {"trend": 0.5, "sentiment": 0.5, "novelty": 0.5, "liquidity": 0.5, "competition": 0.5}
     
     # 3. LLM Call or Heuristic Extraction
-    if os.getenv("MEMESEER_DISABLE_LLM") != "1":
+    if not DISABLE_LLM:
         # Construct facts prompt
         posts_text = "\n".join([f"- {p}" for p in posts]) if posts else "(No external posts)"
         
@@ -391,22 +586,16 @@ Schema:
             world_text_heuristic = "\n".join(world_lines)
             
             # Compute signals heuristically
-            all_text = " ".join([str(p.get("text", "") if isinstance(p, dict) else p).lower() for p in posts])
+            all_text = " ".join([str(p.get("text", "") if isinstance(p, dict) else p) for p in posts]).lower()
             
-            trend_keywords = ["just in", "breaking", "new", "launch", "pump", "surge", "rally", "etf", "fed", "sec", "listing"]
-            sentiment_pos = ["surge", "bull", "up", "win", "record", "approve", "moon"]
-            sentiment_neg = ["down", "crash", "hack", "lawsuit", "ban", "rug", "scam", "bear"]
-            novelty_keywords = ["new", "launch", "first", "now", "today", "breaking"]
-            liquidity_keywords = ["volume", "liquidity", "dex", "cex", "listing", "order book"]
-            competition_keywords = ["vs", "competition", "rival", "beats", "dominates", "market share"]
-            
-            trend_count = sum(1 for kw in trend_keywords if kw in all_text)
-            pos_count = sum(1 for kw in sentiment_pos if kw in all_text)
-            neg_count = sum(1 for kw in sentiment_neg if kw in all_text)
-            novelty_count = sum(1 for kw in novelty_keywords if kw in all_text)
+            kw_counts = _keyword_counts(all_text)
+            trend_count = kw_counts["trend"]
+            pos_count = kw_counts["sentiment_pos"]
+            neg_count = kw_counts["sentiment_neg"]
+            novelty_count = kw_counts["novelty"]
             ticker_count = all_text.count("$")
-            liquidity_count = sum(1 for kw in liquidity_keywords if kw in all_text)
-            competition_count = sum(1 for kw in competition_keywords if kw in all_text)
+            liquidity_count = kw_counts["liquidity"]
+            competition_count = kw_counts["competition"]
             
             num_posts = len(posts)
             
@@ -500,7 +689,7 @@ Schema:
 
 
 def think(world: str) -> str:
-    if os.getenv("MEMESEER_DISABLE_LLM") == "1":
+    if DISABLE_LLM:
         raise RuntimeError("LLM call blocked by MEMESEER_DISABLE_LLM")
 
     api_key = get_openrouter_key()
@@ -523,7 +712,7 @@ Think briefly about current meme narratives in 5-8 sentences.
 
 
 def decide(thought: str) -> Dict[str, Any]:
-    if os.getenv("MEMESEER_DISABLE_LLM") == "1":
+    if DISABLE_LLM:
         raise RuntimeError("LLM call blocked by MEMESEER_DISABLE_LLM")
 
     api_key = get_openrouter_key()
@@ -567,7 +756,7 @@ or
 
 
 def generate_token_idea(thought: str) -> Dict[str, Any]:
-    if os.getenv("MEMESEER_DISABLE_LLM") == "1":
+    if DISABLE_LLM:
         raise RuntimeError("LLM call blocked by MEMESEER_DISABLE_LLM")
 
     api_key = get_openrouter_key()
@@ -603,7 +792,10 @@ JSON schema:
     messages = [{"role": "user", "content": prompt}]
     
     raw = openrouter_chat(messages, model, api_key, timeout_sec=60).strip()
-    obj = extract_first_json_object(raw)
+    return _token_idea_from(extract_first_json_object(raw), raw)
+
+
+def _token_idea_from(obj: Optional[Dict[str, Any]], raw: str) -> Dict[str, Any]:
     if obj is None:
         return {
             "name": "NO_LAUNCH",
@@ -622,6 +814,70 @@ JSON schema:
     }
 
 
+def think_decide_and_ideate(world: str) -> tuple:
+    """
+    think + decide + generate_token_idea as one LLM call (MEMESEER_FUSED_LLM=1).
+    Returns (thought, decision, token_idea); token_idea is None unless launching
+    with a usable idea, so the caller can fall back to generate_token_idea.
+    """
+    if DISABLE_LLM:
+        raise RuntimeError("LLM call blocked by MEMESEER_DISABLE_LLM")
+
+    api_key = get_openrouter_key()
+    if not api_key:
+        raise RuntimeError("OPENROUTER_API_KEY not set")
+
+    prompt = f"""
+You are MemeSeer, an autonomous AI agent living in Moltiverse.
+
+World signal:
+{world}
+
+1. Think briefly about current meme narratives in 5-8 sentences.
+2. Based on that thought, decide whether to launch a memecoin today.
+3. Only if launching, generate a simple, legible, meme-native memecoin concept.
+
+Return ONLY valid JSON (no markdown, no extra text).
+Rules:
+- ticker: 3-6 uppercase letters
+- name: max 20 chars
+- token_idea: null when launch is false
+
+JSON schema:
+{{
+  "thought": "5-8 sentences",
+  "launch": true,
+  "reason": "short explanation",
+  "token_idea": {{
+    "name": "Token name",
+    "ticker": "TICKER",
+    "narrative": "Short meme-native description",
+    "why_now": "Why this works right now"
+  }}
+}}
+"""
+
+    model = get_openrouter_model()
+    messages = [{"role": "user", "content": prompt}]
+
+    raw = openrouter_chat(messages, model, api_key, timeout_sec=90).strip()
+    obj = extract_first_json_object(raw)
+    if obj is None:
+        return raw, {"launch": False, "reason": "JSON parse failed", "_raw": raw}, None
+
+    thought = str(obj.get("thought", "")).strip() or raw
+    decision = {
+        "launch": bool(obj.get("launch", False)),
+        "reason": str(obj.get("reason", "")).strip() or "No reason.",
+        "_raw": raw,
+    }
+    idea_obj = obj.get("token_idea")
+    token_idea = None
+    if decision["launch"] and isinstance(idea_obj, dict) and str(idea_obj.get("ticker", "")).strip():
+        token_idea = _token_idea_from(idea_obj, raw)
+    return thought, decision, token_idea
+
+
 # ----------------
 # Economy bootstrap
 # ----------------
@@ -651,7 +907,7 @@ def should_call_llm(action: str) -> bool:
       - action == "no_launch" -> False
       - otherwise True
     """
-    if os.getenv("MEMESEER_DISABLE_LLM") == "1":
+    if DISABLE_LLM:
         return False
     if action == "no_launch":
         return False
@@ -661,24 +917,13 @@ def should_call_llm(action: str) -> bool:
 # ----------------
 # ERC20 decimals helper
 # ----------------
-ERC20_DECIMALS_ABI = [
-    {
-        "constant": True,
-        "inputs": [],
-        "name": "decimals",
-        "outputs": [{"name": "", "type": "uint8"}],
-        "type": "function",
-    }
-]
-
+def get_token_decimals(executor, token_address: str) -> int:
+    """Fetch ERC20 token decimals through the shared executor (cached per token)."""
+    if executor is None:
+        from onchain.nadfun_executor import get_executor
 
-async def get_token_decimals(executor, token_address: str) -> int:
-    """Fetch ERC20 token decimals from chain via the executor's web3 instance."""
-    contract = executor.trade.w3.eth.contract(
-        address=Web3.to_checksum_address(token_address),
-        abi=ERC20_DECIMALS_ABI,
-    )
-    return contract.functions.decimals().call()
+        executor = get_executor()
+    return executor.get_decimals(token_address)
 
 
 # ----------------
@@ -715,20 +960,39 @@ PAIR_ABI = [
 SEER_PAIR_ADDRESS = "0xA7283d07812a02AFB7C09B60f8896bCEA3F90aCE"
 
 
+def _v2_amount_out(amount_in: int, reserve_in: int, reserve_out: int) -> int:
+    """Uniswap V2 getAmountOut (0.3% fee). Python ints: wei-scale products overflow int64."""
+    amount_in_with_fee = amount_in * 997
+    return (amount_in_with_fee * reserve_out) // (reserve_in * 1000 + amount_in_with_fee)
+
+
+# token0/token1 are immutable for a pair; keyed by checksummed pair address.
+_PAIR_TOKENS: Dict[str, tuple] = {}
+
+
+@functools.lru_cache(maxsize=64)
+def _pair_contract(w3, pair_address):
+    return w3.eth.contract(address=pair_address, abi=PAIR_ABI)
+
+
 def get_amount_out_from_pair(w3, pair_address, token_in, amount_in_raw):
     """Compute expected output using Uniswap V2 AMM formula from pair reserves."""
-    pair = w3.eth.contract(
-        address=Web3.to_checksum_address(pair_address),
-        abi=PAIR_ABI,
-    )
+    from onchain.nadfun_executor import checksum_address
+
+    pair_address = checksum_address(pair_address)
+    pair = _pair_contract(w3, pair_address)
 
     reserve0, reserve1, _ = pair.functions.getReserves().call()
-    token0 = pair.functions.token0().call()
-    token1 = pair.functions.token1().call()
+    tokens = _PAIR_TOKENS.get(pair_address)
+    if tokens is None:
+        tokens = (
+            checksum_address(pair.functions.token0().call()),
+            checksum_address(pair.functions.token1().call()),
+        )
+        _PAIR_TOKENS[pair_address] = tokens
+    token0, token1 = tokens
 
-    token_in = Web3.to_checksum_address(token_in)
-    token0 = Web3.to_checksum_address(token0)
-    token1 = Web3.to_checksum_address(token1)
+    token_in = checksum_address(token_in)
 
     if token_in == token0:
         reserve_in = reserve0
@@ -742,12 +1006,7 @@ def get_amount_out_from_pair(w3, pair_address, token_in, amount_in_raw):
     if reserve_in == 0 or reserve_out == 0:
         raise Exception("Pair has zero liquidity")
 
-    # Uniswap V2 0.3% fee model
-    amount_in_with_fee = amount_in_raw * 997
-    numerator = amount_in_with_fee * reserve_out
-    denominator = reserve_in * 1000 + amount_in_with_fee
-
-    return numerator // denominator
+    return _v2_amount_out(amount_in_raw, reserve_in, reserve_out)
 
 
 # ----------------
@@ -760,7 +1019,7 @@ def main() -> None:
     ensure_memory(memory)
 
     # 🛑 KILL SWITCH CHECK
-    if memory.get("system", {}).get("kill_switch", False):
+    if (memory["system"] or {}).get("kill_switch", False):
         append_event(memory, {
             "type": "kill_switch_active",
             "timestamp": utc_now_ts()
@@ -770,9 +1029,11 @@ def main() -> None:
         return
 
     bootstrap_economy_if_needed(memory)
+    # Stable after bootstrap (write_balances swaps eco["balances"], never eco itself)
+    eco = memory["economy"]
 
     # Manage existing portfolio first
-    manage_portfolio(memory)
+    manage_portfolio(memory, save_memory, append_event)
 
     # Initialize variables for safe failure paths
     outbox_path = None
@@ -794,7 +1055,7 @@ def main() -> None:
     
     world_text = observe(memory)
 
-    world_data = memory.get("world", {})
+    world_data = memory["world"]  # always rebuilt by observe()
     edge = world_data.get("edge", 0.0)
     
     chosen_policy = select_mode(memory, edge)
@@ -813,7 +1074,7 @@ def main() -> None:
         append_event(memory, {"type": "learning_update", **bandit_update})
 
         record = {
-            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "timestamp": local_now_iso(),
             "timestamp_utc": utc_now_iso(),
             "agent": AGENT_NAME,
             "world_edge": edge,
@@ -838,7 +1099,7 @@ def main() -> None:
         append_event(memory, {"type": "learning_update", **bandit_update})
 
         record = {
-            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "timestamp": local_now_iso(),
             "timestamp_utc": utc_now_iso(),
             "agent": AGENT_NAME,
             "world_edge": edge,
@@ -871,7 +1132,7 @@ def main() -> None:
         append_event(memory, {"type": "learning_update", **bandit_update})
 
         record = {
-            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "timestamp": local_now_iso(),
             "timestamp_utc": utc_now_iso(),
             "agent": AGENT_NAME,
             "world_edge": edge,
@@ -891,13 +1152,13 @@ def main() -> None:
 
     # Check if LLM should be called
     if not should_call_llm(mode):
-        llm_reason = "MEMESEER_DISABLE_LLM=1" if os.getenv("MEMESEER_DISABLE_LLM") == "1" else "no_launch"
+        llm_reason = "MEMESEER_DISABLE_LLM=1" if DISABLE_LLM else "no_launch"
         append_event(memory, {"type": "gating_llm_disabled", "mode": mode, "bucket": bucket, "edge": edge, "reason": llm_reason})
         bandit_update = update_bandit(memory, bucket, mode, 0.0)
         append_event(memory, {"type": "learning_update", **bandit_update})
 
         record = {
-            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "timestamp": local_now_iso(),
             "timestamp_utc": utc_now_iso(),
             "agent": AGENT_NAME,
             "world_edge": edge,
@@ -923,7 +1184,7 @@ def main() -> None:
         append_event(memory, {"type": "learning_update", **bandit_update})
 
         record = {
-            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "timestamp": local_now_iso(),
             "timestamp_utc": utc_now_iso(),
             "agent": AGENT_NAME,
             "world_edge": edge,
@@ -940,9 +1201,18 @@ def main() -> None:
     # --- LLM Branch ---
     print(f"Selected action: {mode} (LLM: yes)")
     
+    idea_future = None
+    fused_idea = None
     try:
-        thought = think(world_text + f"\nCalculated Market Edge: {edge:.2f}")
-        decision = decide(thought)
+        world_prompt = world_text + f"\nCalculated Market Edge: {edge:.2f}"
+        if FUSED_LLM:
+            thought, decision, fused_idea = think_decide_and_ideate(world_prompt)
+        else:
+            thought = think(world_prompt)
+            if SPECULATIVE_TOKEN_IDEA:
+                # Both prompts depend only on `thought`; the idea is discarded if decide gates.
+                idea_future = _speculate(generate_token_idea, thought)
+            decision = decide(thought)
     except RuntimeError as e:
         error_msg = str(e)
         print(f"LLM error: {error_msg}, forcing no_launch")
@@ -951,7 +1221,7 @@ def main() -> None:
         append_event(memory, {"type": "learning_update", **bandit_update})
 
         record = {
-            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "timestamp": local_now_iso(),
             "timestamp_utc": utc_now_iso(),
             "agent": AGENT_NAME,
             "world_edge": edge,
@@ -972,7 +1242,7 @@ def main() -> None:
         append_event(memory, {"type": "learning_update", **bandit_update})
 
         record = {
-            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "timestamp": local_now_iso(),
             "timestamp_utc": utc_now_iso(),
             "agent": AGENT_NAME,
             "world_edge": edge,
@@ -990,33 +1260,41 @@ def main() -> None:
         return
 
     if decision.get("launch"):
-        token_idea = generate_token_idea(thought)
+        if fused_idea is not None:
+            token_idea = fused_idea
+        elif idea_future is not None:
+            token_idea = idea_future.result()
+        else:
+            token_idea = generate_token_idea(thought)
         
         if not isinstance(token_idea, dict) or not token_idea.get("ticker"):
             print("Invalid token idea generated, skipping.")
             return
 
-        # 1️⃣ Launch Lock Check
-        control = memory.setdefault("launch_control", {"last_launch_timestamp": 0, "launch_in_progress": False})
-        if control.get("launch_in_progress"):
-            append_event(memory, {"type": "launch_blocked", "reason": "launch already in progress"})
-            save_memory(memory, MEMORY_PATH)
+        # 1️⃣ Launch Lock (OS-level; check-and-take is one atomic flock)
+        control = memory.setdefault("launch_control", {"last_launch_timestamp": 0})
+        lock_fd = acquire_launch_lock(MEMORY_PATH)
+        if lock_fd is None:
+            record_launch_blocked(memory, "launch already in progress")
             return
 
         # 2️⃣ Daily Cooldown Check
+        # Re-read the on-disk value under the lock: a concurrent run may have launched
+        # after this process loaded memory.json.
         now = utc_now_ts()
-        last_launch = control.get("last_launch_timestamp", 0)
+        on_disk = load_memory(MEMORY_PATH)
+        on_disk_last = (on_disk.get("launch_control") or {}).get("last_launch_timestamp", 0)
+        last_launch = max(control.get("last_launch_timestamp", 0), on_disk_last or 0)
+        control["last_launch_timestamp"] = last_launch
         cooldown_period = 86400 # 24 hours
         if now - last_launch < cooldown_period:
-            append_event(memory, {"type": "launch_blocked", "reason": "daily cooldown active"})
-            save_memory(memory, MEMORY_PATH)
+            # Saved while still holding the lock, so no launch can land in between
+            record_launch_blocked(memory, "daily cooldown active", on_disk)
+            release_launch_lock(lock_fd)
             return
 
         # 3️⃣ Execute Launch via NadfunExecutor
         try:
-            memory["launch_control"]["launch_in_progress"] = True
-            save_memory(memory, MEMORY_PATH) # Save immediately to lock
-
             # 3.1 Rate limit check
             if is_rate_limited(memory):
                 append_event(memory, {"type": "launch_blocked", "reason": "rate_limited"})
@@ -1024,14 +1302,18 @@ def main() -> None:
 
             # 3.2 Image generation
             print(f"[LAUNCH] Generating image for {token_idea.get('ticker')}...")
+            from scripts.generate_token_image import generate_token_image as generate_image
+
             img_path = generate_image(
                 token_idea.get("name", "Unknown"),
                 token_idea.get("ticker", "TKN"),
-                memory.get("world", {}).get("mood", "Neutral")
+                world_data.get("mood", "Neutral")
             )
             
             # 3.3 On-chain Launch
-            executor = NadfunExecutor()
+            from onchain.nadfun_executor import get_executor
+
+            executor = get_executor()
             print(f"[LAUNCH] Executing on-chain launch for {token_idea.get('ticker')}...")
             
             launch_result = executor.launch_token(
@@ -1045,6 +1327,9 @@ def main() -> None:
             token_address = launch_result["token_address"]
             tx_hash = launch_result["tx_hash"]
             
+            # One clock reading for everything stamped by this launch
+            # (_iso_cache holds the ts and the ISO strings built from it)
+            launched_ts, _, launched_iso = _iso_cache()
             new_position = {
                 "address": token_address,
                 "ticker": token_idea.get("ticker"),
@@ -1056,63 +1341,68 @@ def main() -> None:
                 "tx_pending": False,
                 "mode": mode,
                 "status": "ACTIVE",
-                "timestamp": utc_now_ts(),
-                "iso_date": utc_now_iso(),
+                "timestamp": launched_ts,
+                "iso_date": launched_iso,
                 "image_path": img_path,
                 "tx_hash": tx_hash
             }
             
             memory["portfolio"]["active_positions"].append(new_position)
-            memory["launch_control"]["last_launch_timestamp"] = utc_now_ts()
-            memory["launch_control"]["launch_in_progress"] = False
+            memory["launch_control"]["last_launch_timestamp"] = launched_ts
             
-            append_event(memory, {"type": "portfolio_entry", **new_position})
+            append_event(memory, {"type": "portfolio_entry", **new_position}, ts=launched_ts)
             
             # 3.5 Social Ritual
+            # Public views shared by the ritual post and the launch record (both read-only)
+            public_idea = {k: v for k, v in token_idea.items() if k in ("name", "ticker", "narrative", "why_now")}
+            public_decision = {k: v for k, v in decision.items() if k != "_raw"}
             signals = {
                 "social": {"highlights": ["On-chain launch successful", "Position ACTIVE"]},
                 "onchain": {"highlights": [f"TX confirmed: {tx_hash}"]},
             }
             result = prepare_ritual_post(
-                launch_json={k: v for k, v in token_idea.items() if k in ("name", "ticker", "narrative", "why_now")},
+                launch_json=public_idea,
                 reasoning=str(decision.get("reason", "")),
                 signals=signals,
                 outbox_dir=memory["social"].get("outbox_dir", OUTBOX_DIR),
                 extra={
-                    "balances": memory.get("economy", {}).get("balances", {}),
+                    "balances": eco["balances"],
                     "policy": chosen_policy,
                 },
             )
             outbox_path = result.outbox_path
             
             memory["launches"][result.launch_id] = {
-                "created_at": utc_now_iso(),
-                "ts": utc_now_ts(),
+                "created_at": launched_iso,
+                "ts": launched_ts,
                 "status": "LAUNCH_COMPLETE",
                 "token_address": token_address,
-                "token_idea": {k: v for k, v in token_idea.items() if k in ("name", "ticker", "narrative", "why_now")},
+                "token_idea": public_idea,
                 "world": world_text,
                 "thought": thought,
-                "decision": {k: v for k, v in decision.items() if k != "_raw"},
+                "decision": public_decision,
                 "outbox_path": outbox_path,
                 "tx_hash": tx_hash
             }
-            memory["social"]["last_ritual_post_ts"] = utc_now_ts()
+            _invalidate_ticker_index()
+            memory["social"]["last_ritual_post_ts"] = launched_ts
             memory["stats"]["ritual_posts_total"] = int(memory["stats"].get("ritual_posts_total", 0)) + 1
-            append_event(memory, {"type": "ritual_post_written", "launch_id": result.launch_id, "outbox_path": outbox_path})
+            append_event(memory, {"type": "ritual_post_written", "launch_id": result.launch_id, "outbox_path": outbox_path}, ts=launched_ts)
             
             launch_successful = True
+            # Checkpoint right after the irreversible on-chain step, before the run record
             save_memory(memory, MEMORY_PATH)
             print(f"[LAUNCH SUCCESS] Token: {token_address}, Tx: {tx_hash}")
 
         except Exception as e:
             print(f"[LAUNCH ERROR] {e}")
-            memory["launch_control"]["launch_in_progress"] = False
             append_event(memory, {"type": "launch_failed", "reason": str(e)})
-            save_memory(memory, MEMORY_PATH)
+            # persisted by the end-of-run save below
+        finally:
+            release_launch_lock(lock_fd)
 
     record = {
-        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "timestamp": local_now_iso(),
         "timestamp_utc": utc_now_iso(),
         "agent": AGENT_NAME,
         "world": world_text,
@@ -1120,7 +1410,7 @@ def main() -> None:
         "decision": decision,
         "token_idea": token_idea,
         "outbox_path": outbox_path if outbox_path else None,
-        "economy": memory.get("economy", {}),
+        "economy": eco,
         "learning": memory.get("learning", {}),
     }
     append_event(memory, {"type": "run", "record": record})
@@ -1134,7 +1424,7 @@ def main() -> None:
         print("Policy:", {k: chosen_policy[k] for k in chosen_policy if k in ("mode", "buyback_pct", "burn_pct")})
     if launch_successful and outbox_path:
         print("Ritual post:", outbox_path)
-    print("Balances:", memory.get("economy", {}).get("balances"))
+    print("Balances:", eco["balances"])
 
     save_memory(memory, MEMORY_PATH)
     print("memory.json saved.")
@@ -1,286 +1,920 @@
-import os
-import json
-import time
-import requests
-import secrets
-from web3 import Web3
-from eth_account import Account
-
-# Constants
-REQUIRED_FUNDING_MON = 230.0  # Threshold to trigger funding
-LAUNCH_BUDGET_MON = 200.0     # Final budget for launch
-SLIPPAGE_BPS = 9500           # 5% slippage (95%)
-BUFFER_MON = 0.01
-
-class NadfunExecutor:
-    def __init__(self, rpc_url=None, private_key=None):
-        self.rpc_url = rpc_url or os.getenv("RPC_URL")
-        self.private_key = private_key or os.getenv("PRIVATE_KEY")
-        
-        if not self.rpc_url or not self.private_key:
-            raise Exception("NadfunExecutor: Missing RPC_URL or PRIVATE_KEY")
-            
-        self.w3 = Web3(Web3.HTTPProvider(self.rpc_url))
-        self.account = Account.from_key(self.private_key)
-        self.address = self.account.address
-        
-        # Addresses
-        self.ROUTER_ADDR = Web3.to_checksum_address("0x6F6B8F1a20703309951a5127c45B49b1CD981A22")
-        self.CURVE_ADDR = Web3.to_checksum_address("0xA7283d07812a02AFB7C09B60f8896bCEA3F90aCE")
-        self.LENS_ADDR = Web3.to_checksum_address("0x7e78A8DE94f21804F7a17F4E8BF9EC2c872187ea")
-        self.SEER_TOKEN = Web3.to_checksum_address(os.getenv("SEER_TOKEN_ADDRESS", "0x0d500B1d8E8eF31E21C99d1Db9A6444d3ADf1270"))
-        
-        # Load ABIs from onchain/abi/
-        self.router_abi = self._load_abi("onchain/abi/IBondingCurveRouter.json")
-        self.curve_abi = self._load_abi("onchain/abi/BondingCurve.json")
-        self.lens_abi = self._load_abi("onchain/abi/Lens.json")
-        
-        self.router = self.w3.eth.contract(address=self.ROUTER_ADDR, abi=self.router_abi)
-        self.curve = self.w3.eth.contract(address=self.CURVE_ADDR, abi=self.curve_abi)
-        self.lens = self.w3.eth.contract(address=self.LENS_ADDR, abi=self.lens_abi)
-
-    def _load_abi(self, path):
-        with open(path, "r") as f:
-            return json.load(f)
-
-    def get_mon_balance(self):
-        balance_wei = self.w3.eth.get_balance(self.address)
-        return float(self.w3.from_wei(balance_wei, "ether"))
-
-    def ensure_mon_balance(self):
-        current = self.get_mon_balance()
-        print(f"Current MON balance: {current:.2f}")
-        
-        if current >= REQUIRED_FUNDING_MON:
-            print("Balance sufficient.")
-            return
-            
-        shortfall = REQUIRED_FUNDING_MON - current
-        print(f"Shortfall detected: {shortfall:.2f} MON. Funding via CORE...")
-        self.sell_core_for_mon(shortfall)
-
-    def sell_core_for_mon(self, amount_mon_needed):
-        """
-        Sells CORE (SEER) tokens for MON to cover shortfall.
-        Uses router.sell(SellParams) where SellParams is:
-        (amountIn, amountOutMin, token, to, deadline)
-        """
-    
-        print(f"Executing sell for {amount_mon_needed:.2f} MON shortfall...")
-    
-        # --------------------------------------------------
-        # 1️⃣ Get SEER decimals
-        # --------------------------------------------------
-        token_contract = self.w3.eth.contract(
-            address=self.SEER_TOKEN,
-            abi=[{
-                "inputs": [],
-                "name": "decimals",
-                "outputs": [{"internalType": "uint8", "name": "", "type": "uint8"}],
-                "stateMutability": "view",
-                "type": "function",
-            }]
-        )
-    
-        decimals = token_contract.functions.decimals().call()
-    
-        # --------------------------------------------------
-        # 2️⃣ Estimate required SEER using bonding curve
-        # --------------------------------------------------
-        reserves = self.curve.functions.curves(self.SEER_TOKEN).call()
-        # reserves = (realMon, realToken, virtMon, virtToken)
-    
-        virt_mon = reserves[2]
-        virt_token = reserves[3]
-    
-        dy = self.w3.to_wei(amount_mon_needed, "ether")
-    
-        # 1% safety buffer
-        dy_with_fee = int(dy * 1.01)
-    
-        if dy_with_fee >= virt_mon:
-            raise Exception("Shortfall too large relative to curve liquidity")
-    
-        needed_raw = (virt_token * dy_with_fee) // (virt_mon - dy_with_fee)
-    
-        print(f"  Quoted {needed_raw / (10**decimals):.6f} SEER for {amount_mon_needed:.2f} MON")
-    
-        # --------------------------------------------------
-        # 3️⃣ Approve router to spend SEER
-        # --------------------------------------------------
-        erc20 = self.w3.eth.contract(
-            address=self.SEER_TOKEN,
-            abi=[{
-                "name": "approve",
-                "type": "function",
-                "stateMutability": "nonpayable",
-                "inputs": [
-                    {"name": "spender", "type": "address"},
-                    {"name": "amount", "type": "uint256"},
-                ],
-                "outputs": [{"name": "", "type": "bool"}],
-            }]
-        )
-    
-        nonce = self.w3.eth.get_transaction_count(self.address)
-    
-        approve_tx = erc20.functions.approve(
-            self.ROUTER_ADDR,
-            needed_raw
-        ).build_transaction({
-            "from": self.address,
-            "nonce": nonce,
-            "gasPrice": self.w3.eth.gas_price,
-            "chainId": self.w3.eth.chain_id,
-        })
-    
-        approve_tx["gas"] = int(self.w3.eth.estimate_gas(approve_tx) * 1.2)
-    
-        signed_approve = self.w3.eth.account.sign_transaction(approve_tx, self.private_key)
-        approve_hash = self.w3.eth.send_raw_transaction(signed_approve.raw_transaction)
-    
-        print(f"Approve TX sent: {approve_hash.hex()}")
-    
-        approve_receipt = self.w3.eth.wait_for_transaction_receipt(approve_hash)
-    
-        if approve_receipt.status != 1:
-            raise Exception("Approve failed")
-    
-        print("Approve successful.")
-    
-        # --------------------------------------------------
-        # 4️⃣ Execute router.sell(SellParams)
-        # --------------------------------------------------
-        amount_out_min = dy  # want at least the shortfall
-        deadline = int(time.time() + 1200)
-    
-        params = (
-            needed_raw,       # amountIn
-            amount_out_min,   # amountOutMin
-            self.SEER_TOKEN,  # token
-            self.address,     # to
-            deadline          # deadline
-        )
-    
-        nonce += 1
-    
-        sell_tx = self.router.functions.sell(params).build_transaction({
-            "from": self.address,
-            "nonce": nonce,
-            "gasPrice": self.w3.eth.gas_price,
-            "chainId": self.w3.eth.chain_id,
-        })
-    
-        sell_tx["gas"] = int(self.w3.eth.estimate_gas(sell_tx) * 1.2)
-    
-        signed_sell = self.w3.eth.account.sign_transaction(sell_tx, self.private_key)
-        sell_hash = self.w3.eth.send_raw_transaction(signed_sell.raw_transaction)
-    
-        print(f"Sell TX sent: {sell_hash.hex()}")
-    
-        receipt = self.w3.eth.wait_for_transaction_receipt(sell_hash)
-    
-        if receipt.status != 1:
-            raise Exception("CORE sell failed")
-    
-        print("CORE sell successful.")
-
-
-
-    def launch_token(self, name, symbol, description, image_path):
-        """
-        Full launch flow: Image -> Metadata -> Salt -> Create
-        """
-        self.ensure_mon_balance()
-        
-        print(f"Launching token {name} ({symbol})...")
-        
-        # 1. Upload Image
-        with open(image_path, "rb") as f:
-            img_resp = requests.post(
-                "https://api.nad.fun/metadata/image",
-                headers={"Content-Type": "image/png"},
-                data=f.read()
-            )
-            img_resp.raise_for_status()
-            image_uri = img_resp.json()["image_uri"]
-            
-        # 2. Upload Metadata
-        meta_resp = requests.post(
-            "https://api.nad.fun/metadata/metadata",
-            json={
-                "image_uri": image_uri,
-                "name": name,
-                "symbol": symbol,
-                "description": description
-            }
-        )
-        meta_resp.raise_for_status()
-        metadata_uri = meta_resp.json()["metadata_uri"]
-        
-        # 3. Mine Salt
-        salt_resp = requests.post(
-            "https://api.nad.fun/token/salt",
-            json={
-                "creator": self.address,
-                "name": name,
-                "symbol": symbol,
-                "metadata_uri": metadata_uri
-            }
-        )
-        salt_resp.raise_for_status()
-        salt_data = salt_resp.json()
-        salt = salt_data["salt"]
-        predicted_address = salt_data["address"]
-        
-        # 4. Contracts Logic
-        deploy_fee = self.curve.functions.feeConfig().call()[0]
-        amount_in_wei = self.w3.to_wei(LAUNCH_BUDGET_MON, "ether")
-        
-        expected_out = self.lens.functions.getInitialBuyAmountOut(amount_in_wei).call()
-        amount_out_min = expected_out * SLIPPAGE_BPS // 10000
-        
-        buffer_wei = self.w3.to_wei(BUFFER_MON, "ether")
-        total_value = deploy_fee + amount_in_wei + buffer_wei
-        
-        params = (
-            name,
-            symbol,
-            metadata_uri,
-            amount_out_min,
-            salt,
-            1,  # actionId
-        )
-        
-        # Final TX
-        nonce = self.w3.eth.get_transaction_count(self.address)
-        tx = self.router.functions.create(params).build_transaction({
-            "from": self.address,
-            "value": total_value,
-            "nonce": nonce,
-            "gasPrice": self.w3.eth.gas_price,
-            "chainId": self.w3.eth.chain_id
-        })
-        
-        tx["gas"] = int(self.w3.eth.estimate_gas(tx) * 1.2)
-        signed = self.w3.eth.account.sign_transaction(tx, self.private_key)
-        
-        tx_hash = self.w3.eth.send_raw_transaction(signed.raw_transaction)
-        print(f"Launch TX sent: {tx_hash.hex()}")
-        
-        receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-        if receipt.status != 1:
-            raise Exception(f"Launch failed. Status: {receipt.status}")
-            
-        print(f"Launch successful! Token: {predicted_address}")
-        
-        return {
-            "token_address": predicted_address,
-            "tx_hash": tx_hash.hex(),
-            "tokens_received_raw": int(expected_out)
-        }
-
-
-
-
-
+import os
+import json
+import time
+import functools
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+from web3 import Web3
+from eth_account import Account
+from eth_account.messages import encode_typed_data
+from hexbytes import HexBytes
+
+try:
+    import orjson  # optional: faster JSON-RPC response decoding
+except ImportError:
+    orjson = None
+
+# Constants
+REQUIRED_FUNDING_MON = 230.0  # Threshold to trigger funding
+LAUNCH_BUDGET_MON = 200.0     # Final budget for launch
+SLIPPAGE_BPS = 9500           # 5% slippage (95%)
+BUFFER_MON = 0.01
+WEI = 10**18                  # wei per MON; plain int math instead of web3's Decimal to_wei/from_wei
+LAUNCH_BUDGET_WEI = int(LAUNCH_BUDGET_MON * WEI)
+BUFFER_WEI = int(BUFFER_MON * WEI)
+MAX_UINT256 = 2**256 - 1      # "infinite" ERC20 approval
+APPROVE_GAS_LIMIT = 60_000    # approve() is ~46k; fixed limit instead of estimate_gas
+SELL_GAS_LIMIT = 400_000      # sell sent behind an unmined approve can't be estimated
+CREATE_GAS_LIMIT = int(os.getenv("NADFUN_CREATE_GAS_LIMIT", "4000000"))
+
+# Use the fixed limits above instead of an eth_estimateGas round-trip per tx.
+# Off by default: Monad bills the gas *limit*, so fixed limits trade MON for latency.
+FIXED_GAS = os.getenv("NADFUN_FIXED_GAS", "0") == "1"
+
+# Reuse the gasUsed of the last successful tx with the same selector (+20%) instead
+# of estimating again. Off by default: a heavier path than last time runs out of gas.
+# Kept in a small JSON file so one-shot runs benefit from earlier ones.
+LEARNED_GAS = os.getenv("NADFUN_LEARNED_GAS", "0") == "1"
+GAS_CACHE_PATH = os.getenv("NADFUN_GAS_CACHE_PATH", "nadfun_gas.json")
+
+# Receipt polling: web3 defaults to a 0.1s poll, i.e. several eth_getTransactionReceipt
+# calls per block per pending tx. Poll about once per block instead.
+RECEIPT_TIMEOUT_S = float(os.getenv("NADFUN_RECEIPT_TIMEOUT_S", "180"))
+RECEIPT_POLL_S = float(os.getenv("NADFUN_RECEIPT_POLL_S", "0.5"))
+
+# Fold the SEER approval into the sell via EIP-2612 (router.sellPermit) instead of a
+# separate approve tx. Falls back to approve+sell if the token's domain doesn't match.
+SELL_PERMIT = os.getenv("NADFUN_SELL_PERMIT", "0") == "1"
+
+# Approve/permit the router for MAX_UINT256 so later sells skip the approval step.
+# Off by default: an unlimited allowance lets a compromised or buggy router drain
+# every SEER the wallet holds, so by default each sell approves exactly what it sells.
+INFINITE_APPROVAL = os.getenv("NADFUN_INFINITE_APPROVAL", "0") == "1"
+PERMIT_VERSION = os.getenv("NADFUN_PERMIT_VERSION", "1")
+
+# Reuse a fetched gas price for this long (e.g. the CORE sell feeding straight into a launch)
+GAS_PRICE_TTL_S = float(os.getenv("NADFUN_GAS_PRICE_TTL_S", "3"))
+
+# Send read-only calls as one JSON-RPC batch (some providers reject or penalize batches)
+BATCH_RPC = os.getenv("NADFUN_BATCH_RPC", "0") == "1"
+
+# Small pool for overlapping independent read-only RPCs
+_RPC_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="nadfun-rpc")
+
+APPROVE_SELECTOR = "095ea7b3"  # keccak("approve(address,uint256)")[:4]
+
+def _approve_calldata(spender, amount):
+    """Hand-encoded approve(spender, amount): selector + two 32-byte words."""
+    return "0x" + APPROVE_SELECTOR + spender[2:].lower().rjust(64, "0") + format(amount, "064x")
+
+@functools.lru_cache(maxsize=4096)
+def checksum_address(addr):
+    """EIP-55 checksum (keccak per call) memoized per address string."""
+    return Web3.to_checksum_address(addr)
+
+ABI_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "abi")
+
+@functools.lru_cache(maxsize=None)
+def load_abi(filename):
+    """ABI from onchain/abi/, parsed once per process (resolved next to this module, not the cwd)."""
+    with open(os.path.join(ABI_DIR, filename), "r") as f:
+        return json.load(f)
+
+class _OrjsonHTTPProvider(Web3.HTTPProvider):
+    """
+    HTTPProvider decoding JSON-RPC responses (receipts, logs, batches) with orjson.
+    Safe because JSON-RPC quantities are hex strings, never bare big integers.
+    """
+
+    @staticmethod
+    def decode_rpc_response(raw_response):
+        try:
+            return orjson.loads(raw_response)
+        except orjson.JSONDecodeError:
+            # Let the stock decoder raise its usual, more descriptive error
+            return Web3.HTTPProvider.decode_rpc_response(raw_response)
+
+def _rpc_session():
+    """Keep-alive session for the JSON-RPC provider, sized for _RPC_POOL."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def _api_session():
+    """
+    Keep-alive session for the nad.fun REST API. Retries only failed connects:
+    the uploads are POSTs (the image one streamed from a file), so anything that
+    may have reached the server is not replayed.
+    """
+    session = requests.Session()
+    retry = Retry(total=3, connect=3, read=0, status=0, other=0, backoff_factor=0.2)
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retry))
+    return session
+
+# Router struct arguments, field order matching IBondingCurveRouter.json.
+# Pass them to web3 as tuple(params): its ABI normalizer rebuilds tuple args via
+# type(value)(generator), which a NamedTuple constructor rejects.
+class SellParams(NamedTuple):
+    amountIn: int
+    amountOutMin: int
+    token: str
+    to: str
+    deadline: int
+
+class SellPermitParams(NamedTuple):
+    amountIn: int
+    amountOutMin: int
+    amountAllowance: int
+    token: str
+    to: str
+    deadline: int
+    v: int
+    r: bytes
+    s: bytes
+
+class CreateParams(NamedTuple):
+    name: str
+    symbol: str
+    tokenURI: str
+    amountOut: int
+    salt: str  # 0x-prefixed bytes32 from the salt API
+    actionId: int
+
+# Minimal ERC20 ABI (decimals + allowance + approve, EIP-2612 reads) used for the CORE sell path
+ERC20_ABI = [
+    {
+        "name": "name",
+        "type": "function",
+        "stateMutability": "view",
+        "inputs": [],
+        "outputs": [{"name": "", "type": "string"}],
+    },
+    {
+        "name": "nonces",
+        "type": "function",
+        "stateMutability": "view",
+        "inputs": [{"name": "owner", "type": "address"}],
+        "outputs": [{"name": "", "type": "uint256"}],
+    },
+    {
+        "name": "DOMAIN_SEPARATOR",
+        "type": "function",
+        "stateMutability": "view",
+        "inputs": [],
+        "outputs": [{"name": "", "type": "bytes32"}],
+    },
+    {
+        "inputs": [],
+        "name": "decimals",
+        "outputs": [{"internalType": "uint8", "name": "", "type": "uint8"}],
+        "stateMutability": "view",
+        "type": "function",
+    },
+    {
+        "name": "allowance",
+        "type": "function",
+        "stateMutability": "view",
+        "inputs": [
+            {"name": "owner", "type": "address"},
+            {"name": "spender", "type": "address"},
+        ],
+        "outputs": [{"name": "", "type": "uint256"}],
+    },
+    {
+        "name": "approve",
+        "type": "function",
+        "stateMutability": "nonpayable",
+        "inputs": [
+            {"name": "spender", "type": "address"},
+            {"name": "amount", "type": "uint256"},
+        ],
+        "outputs": [{"name": "", "type": "bool"}],
+    },
+]
+
+class NadfunExecutor:
+    def __init__(self, rpc_url=None, private_key=None):
+        self.rpc_url = rpc_url or os.getenv("RPC_URL")
+        self.private_key = private_key or os.getenv("PRIVATE_KEY")
+        
+        if not self.rpc_url or not self.private_key:
+            raise Exception("NadfunExecutor: Missing RPC_URL or PRIVATE_KEY")
+            
+        provider_cls = _OrjsonHTTPProvider if orjson is not None else Web3.HTTPProvider
+        self.w3 = Web3(provider_cls(self.rpc_url, session=_rpc_session()))
+        # Keep-alive session for the nad.fun REST API: image -> metadata -> salt share one TLS connection
+        self.http = _api_session()
+        self.account = Account.from_key(self.private_key)
+        self.address = self.account.address
+        
+        # Addresses
+        self.ROUTER_ADDR = checksum_address("0x6F6B8F1a20703309951a5127c45B49b1CD981A22")
+        self.CURVE_ADDR = checksum_address("0xA7283d07812a02AFB7C09B60f8896bCEA3F90aCE")
+        self.LENS_ADDR = checksum_address("0x7e78A8DE94f21804F7a17F4E8BF9EC2c872187ea")
+        self.SEER_TOKEN = checksum_address(os.getenv("SEER_TOKEN_ADDRESS", "0x0d500B1d8E8eF31E21C99d1Db9A6444d3ADf1270"))
+        
+        # Load ABIs from onchain/abi/
+        self.router_abi = load_abi("IBondingCurveRouter.json")
+        self.curve_abi = load_abi("BondingCurve.json")
+        self.lens_abi = load_abi("Lens.json")
+        
+        self.router = self.w3.eth.contract(address=self.ROUTER_ADDR, abi=self.router_abi)
+        self.curve = self.w3.eth.contract(address=self.CURVE_ADDR, abi=self.curve_abi)
+        self.lens = self.w3.eth.contract(address=self.LENS_ADDR, abi=self.lens_abi)
+        
+        # token address -> ERC20 contract, built on first use
+        self._erc20_cache = {}
+        # token address -> decimals(), see get_decimals()
+        self._decimals_cache = {}
+        # (token, spender) -> last known allowance, so repeat sells skip the read
+        self._allowance_cache = {}
+        # (token, spender) pairs approved for MAX_UINT256: no allowance checks needed
+        self._approved = set()
+        # approve(router, MAX_UINT256) calldata is the same for every token
+        self._approve_router_max_data = _approve_calldata(self.ROUTER_ADDR, MAX_UINT256)
+        # feeConfig()[0], see deploy_fee()
+        self._deploy_fee = None
+        # (gas price, monotonic time fetched), see _fresh_gas_price()
+        self._gas_price = None
+        # Next nonce after our own sends (None = ask the node), see _send_raw
+        self._nonce = None
+        # function selector -> gasUsed of its last successful tx, see LEARNED_GAS
+        self._gas_used = self._load_gas_cache() if LEARNED_GAS else {}
+        # tx hash (hex) -> calldata of sells sent by sell(), learned in wait_for_receipt()
+        self._pending_sells = {}
+
+    @functools.cached_property
+    def chain_id(self):
+        """Fixed for the life of the RPC endpoint: fetched once, on first signed tx."""
+        return self.w3.eth.chain_id
+
+    def _legacy_tx(self, to, data, nonce, gas_price, value=0, gas=None):
+        """
+        Plain tx dict from precomputed calldata (no build_transaction pass).
+        gas=None estimates it (or, with LEARNED_GAS, reuses the selector's last
+        gasUsed), with 20% headroom.
+        """
+        if gas is None and LEARNED_GAS:
+            used = self._gas_used.get(data[:10])
+            if used is not None:
+                gas = int(used * 1.2)
+        tx = {
+            "to": to,
+            "from": self.address,
+            "data": data,
+            "value": value,
+            "nonce": nonce,
+            "gasPrice": gas_price,
+            "chainId": self.chain_id,
+        }
+        tx["gas"] = gas if gas is not None else int(self.w3.eth.estimate_gas(tx) * 1.2)
+        return tx
+
+    def _fresh_gas_price(self):
+        """Gas price fetched within the last GAS_PRICE_TTL_S seconds, or None."""
+        if self._gas_price is not None and time.monotonic() - self._gas_price[1] < GAS_PRICE_TTL_S:
+            return self._gas_price[0]
+        return None
+
+    def _remember_gas_price(self, gas_price):
+        self._gas_price = (gas_price, time.monotonic())
+        return gas_price
+
+    def _send_raw(self, signed, nonce):
+        """
+        eth_sendRawTransaction straight through the provider. The tx is already
+        signed and encoded, so web3's request formatters and middleware add nothing.
+        Tracks the account nonce locally; any failure drops it so the next read
+        phase re-syncs from the node.
+        """
+        try:
+            response = self.w3.provider.make_request(
+                "eth_sendRawTransaction", [Web3.to_hex(signed.raw_transaction)]
+            )
+        except Exception:
+            self._nonce = None
+            raise
+        if "error" in response:
+            self._nonce = None
+            raise Exception(f"eth_sendRawTransaction failed: {response['error']}")
+        self._nonce = nonce + 1
+        return HexBytes(response["result"])
+
+    @staticmethod
+    def _load_gas_cache():
+        try:
+            with open(GAS_CACHE_PATH, "r") as f:
+                return {k: int(v) for k, v in json.load(f).items()}
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+    def _learn_gas(self, data, receipt):
+        if not LEARNED_GAS or receipt.status != 1:
+            return
+        selector = data[:10]
+        if self._gas_used.get(selector) == receipt.gasUsed:
+            return
+        self._gas_used[selector] = receipt.gasUsed
+        try:
+            tmp = GAS_CACHE_PATH + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(self._gas_used, f)
+            os.replace(tmp, GAS_CACHE_PATH)
+        except OSError as e:
+            print(f"Gas cache not saved: {e}")
+
+    def _erc20(self, token_address):
+        contract = self._erc20_cache.get(token_address)
+        if contract is None:
+            # Keyed on the caller's spelling; web3 needs the checksummed form
+            contract = self.w3.eth.contract(address=checksum_address(token_address), abi=ERC20_ABI)
+            self._erc20_cache[token_address] = contract
+        return contract
+
+    def _wait_for_receipt(self, tx_hash):
+        try:
+            return self.w3.eth.wait_for_transaction_receipt(
+                tx_hash, timeout=RECEIPT_TIMEOUT_S, poll_latency=RECEIPT_POLL_S
+            )
+        except Exception:
+            # Possibly dropped from the mempool: don't build on the local nonce
+            self._nonce = None
+            raise
+
+    def get_decimals(self, token_address):
+        """ERC20 decimals() of token_address; immutable, so read once per token."""
+        decimals = self._decimals_cache.get(token_address)
+        if decimals is None:
+            decimals = self._erc20(token_address).functions.decimals().call()
+            self._decimals_cache[token_address] = decimals
+        return decimals
+
+    def get_mon_balance(self):
+        balance_wei = self.w3.eth.get_balance(self.address)
+        return balance_wei / WEI
+
+    def ensure_mon_balance(self):
+        current = self.get_mon_balance()
+        print(f"Current MON balance: {current:.2f}")
+        
+        if current >= REQUIRED_FUNDING_MON:
+            print("Balance sufficient.")
+            return
+            
+        shortfall = REQUIRED_FUNDING_MON - current
+        print(f"Shortfall detected: {shortfall:.2f} MON. Funding via CORE...")
+        self.sell_core_for_mon(shortfall)
+
+    def _sell_reads(self, token_contract, with_allowance):
+        """
+        Read phase of the CORE sell:
+        (decimals, curve reserves, nonce, gas price, allowance or None).
+        The calls are independent, so they go out together: as one JSON-RPC batch
+        when BATCH_RPC is on, otherwise overlapped on _RPC_POOL.
+        """
+        eth = self.w3.eth
+        gas_price = self._fresh_gas_price()
+        nonce = self._nonce
+        if BATCH_RPC:
+            try:
+                with self.w3.batch_requests() as batch:
+                    batch.add(token_contract.functions.decimals())
+                    batch.add(self.curve.functions.curves(self.SEER_TOKEN))
+                    if nonce is None:
+                        batch.add(eth.get_transaction_count(self.address))
+                    if gas_price is None:
+                        batch.add(eth.gas_price)
+                    if with_allowance:
+                        batch.add(token_contract.functions.allowance(self.address, self.ROUTER_ADDR))
+                    results = iter(batch.execute())
+                decimals, reserves = next(results), next(results)
+                if nonce is None:
+                    nonce = next(results)
+                if gas_price is None:
+                    gas_price = self._remember_gas_price(next(results))
+                return decimals, reserves, nonce, gas_price, next(results, None)
+            except Exception as e:
+                print(f"Batch RPC failed ({e}), falling back to parallel calls")
+    
+        f_decimals = _RPC_POOL.submit(token_contract.functions.decimals().call)
+        f_reserves = _RPC_POOL.submit(self.curve.functions.curves(self.SEER_TOKEN).call)
+        f_nonce = None
+        if nonce is None:
+            f_nonce = _RPC_POOL.submit(eth.get_transaction_count, self.address)
+        f_gas_price = None
+        if gas_price is None:
+            f_gas_price = _RPC_POOL.submit(lambda: eth.gas_price)
+        f_allowance = None
+        if with_allowance:
+            f_allowance = _RPC_POOL.submit(
+                token_contract.functions.allowance(self.address, self.ROUTER_ADDR).call
+            )
+        if f_gas_price is not None:
+            gas_price = self._remember_gas_price(f_gas_price.result())
+        return (
+            f_decimals.result(),
+            f_reserves.result(),
+            f_nonce.result() if f_nonce is not None else nonce,
+            gas_price,
+            f_allowance.result() if f_allowance is not None else None,
+        )
+
+    def deploy_fee(self):
+        """Curve deploy fee (feeConfig()[0]); fetched once per executor."""
+        if self._deploy_fee is None:
+            self._deploy_fee = self.curve.functions.feeConfig().call()[0]
+        return self._deploy_fee
+
+    def _launch_reads(self, amount_in_wei, with_quote):
+        """
+        Read phase of create(): (initial-buy quote or None, nonce, gas price).
+        Same fan-out as _sell_reads: one JSON-RPC batch when BATCH_RPC is on,
+        otherwise overlapped on _RPC_POOL.
+        """
+        eth = self.w3.eth
+        gas_price = self._fresh_gas_price()
+        nonce = self._nonce
+        if BATCH_RPC and (nonce is None or gas_price is None or with_quote):
+            try:
+                with self.w3.batch_requests() as batch:
+                    if nonce is None:
+                        batch.add(eth.get_transaction_count(self.address))
+                    if gas_price is None:
+                        batch.add(eth.gas_price)
+                    if with_quote:
+                        batch.add(self.lens.functions.getInitialBuyAmountOut(amount_in_wei))
+                    results = iter(batch.execute())
+                if nonce is None:
+                    nonce = next(results)
+                if gas_price is None:
+                    gas_price = self._remember_gas_price(next(results))
+                return next(results, None), nonce, gas_price
+            except Exception as e:
+                print(f"Batch RPC failed ({e}), falling back to parallel calls")
+    
+        f_nonce = None
+        if nonce is None:
+            f_nonce = _RPC_POOL.submit(eth.get_transaction_count, self.address)
+        f_gas_price = None
+        if gas_price is None:
+            f_gas_price = _RPC_POOL.submit(lambda: eth.gas_price)
+        f_quote = None
+        if with_quote:
+            f_quote = _RPC_POOL.submit(
+                self.lens.functions.getInitialBuyAmountOut(amount_in_wei).call
+            )
+        if f_gas_price is not None:
+            gas_price = self._remember_gas_price(f_gas_price.result())
+        return (
+            f_quote.result() if f_quote is not None else None,
+            f_nonce.result() if f_nonce is not None else nonce,
+            gas_price,
+        )
+
+    def get_amounts_out(self, quotes):
+        """
+        Quote many (token, amount_in_raw, is_buy) requests via Lens.getAmountOut.
+        Returns [(router, amount_out_raw), ...] aligned with the input. One JSON-RPC
+        batch when BATCH_RPC is on, otherwise the calls are overlapped on _RPC_POOL.
+        """
+        calls = [
+            self.lens.functions.getAmountOut(checksum_address(token), int(amount_in), bool(is_buy))
+            for token, amount_in, is_buy in quotes
+        ]
+        if not calls:
+            return []
+    
+        if BATCH_RPC:
+            try:
+                with self.w3.batch_requests() as batch:
+                    for call in calls:
+                        batch.add(call)
+                    return [tuple(r) for r in batch.execute()]
+            except Exception as e:
+                print(f"Batch RPC failed ({e}), falling back to parallel calls")
+    
+        futures = [_RPC_POOL.submit(call.call) for call in calls]
+        return [tuple(f.result()) for f in futures]
+
+    def _sign_permit(self, token_contract, spender, value, deadline):
+        """
+        EIP-2612 permit signature (v, r, s) for token_contract, or None when the
+        locally built EIP-712 domain doesn't match the token's DOMAIN_SEPARATOR.
+        """
+        fns = token_contract.functions
+        f_name = _RPC_POOL.submit(fns.name().call)
+        f_nonce = _RPC_POOL.submit(fns.nonces(self.address).call)
+        f_domain = _RPC_POOL.submit(fns.DOMAIN_SEPARATOR().call)
+    
+        signable = encode_typed_data(full_message={
+            "types": {
+                "EIP712Domain": [
+                    {"name": "name", "type": "string"},
+                    {"name": "version", "type": "string"},
+                    {"name": "chainId", "type": "uint256"},
+                    {"name": "verifyingContract", "type": "address"},
+                ],
+                "Permit": [
+                    {"name": "owner", "type": "address"},
+                    {"name": "spender", "type": "address"},
+                    {"name": "value", "type": "uint256"},
+                    {"name": "nonce", "type": "uint256"},
+                    {"name": "deadline", "type": "uint256"},
+                ],
+            },
+            "primaryType": "Permit",
+            "domain": {
+                "name": f_name.result(),
+                "version": PERMIT_VERSION,
+                "chainId": self.chain_id,
+                "verifyingContract": token_contract.address,
+            },
+            "message": {
+                "owner": self.address,
+                "spender": spender,
+                "value": value,
+                "nonce": f_nonce.result(),
+                "deadline": deadline,
+            },
+        })
+        # header is the EIP-712 domain separator hash
+        if bytes(signable.header) != bytes(f_domain.result()):
+            print("Permit domain mismatch, falling back to approve.")
+            return None
+    
+        signed = self.account.sign_message(signable)
+        return signed.v, signed.r.to_bytes(32, "big"), signed.s.to_bytes(32, "big")
+
+    def _set_allowance(self, allowance_key, allowance):
+        self._allowance_cache[allowance_key] = allowance
+        if allowance == MAX_UINT256:
+            self._approved.add(allowance_key)
+        else:
+            self._approved.discard(allowance_key)
+
+    def sell_core_for_mon(self, amount_mon_needed):
+        """
+        Sells CORE (SEER) tokens for MON to cover shortfall.
+        Uses router.sell(SellParams) where SellParams is:
+        (amountIn, amountOutMin, token, to, deadline)
+        or, with NADFUN_SELL_PERMIT=1 and a short allowance, router.sellPermit.
+        """
+    
+        print(f"Executing sell for {amount_mon_needed:.2f} MON shortfall...")
+    
+        token_contract = self._erc20(self.SEER_TOKEN)
+        allowance_key = (self.SEER_TOKEN, self.ROUTER_ADDR)
+        infinite = allowance_key in self._approved
+        cached_allowance = MAX_UINT256 if infinite else self._allowance_cache.get(allowance_key)
+    
+        # --------------------------------------------------
+        # 1️⃣ Get SEER decimals, curve reserves, nonce, allowance
+        # --------------------------------------------------
+        decimals, reserves, nonce, gas_price, fresh_allowance = self._sell_reads(
+            token_contract, with_allowance=cached_allowance is None
+        )
+    
+        # --------------------------------------------------
+        # 2️⃣ Estimate required SEER using bonding curve
+        # --------------------------------------------------
+        # reserves = (realMon, realToken, virtMon, virtToken)
+    
+        virt_mon = reserves[2]
+        virt_token = reserves[3]
+    
+        dy = int(amount_mon_needed * WEI)
+    
+        # 1% safety buffer
+        dy_with_fee = int(dy * 1.01)
+    
+        if dy_with_fee >= virt_mon:
+            raise Exception("Shortfall too large relative to curve liquidity")
+    
+        needed_raw = (virt_token * dy_with_fee) // (virt_mon - dy_with_fee)
+    
+        print(f"  Quoted {needed_raw / (10**decimals):.6f} SEER for {amount_mon_needed:.2f} MON")
+    
+        # --------------------------------------------------
+        # 3️⃣ Approve router to spend SEER (only if allowance is short)
+        # --------------------------------------------------
+        # gas_price came from the read phase and is shared by the approve and sell txs below
+        eth = self.w3.eth
+    
+        if fresh_allowance is not None:
+            allowance = fresh_allowance
+        elif cached_allowance < needed_raw:
+            # Cached value is short; confirm on-chain before approving
+            allowance = token_contract.functions.allowance(self.address, self.ROUTER_ADDR).call()
+        else:
+            allowance = cached_allowance
+        self._set_allowance(allowance_key, allowance)
+    
+        amount_out_min = dy  # want at least the shortfall
+        deadline = int(time.time() + 1200)
+    
+        approve_hash = None
+        permit = None
+        approve_amount = MAX_UINT256 if INFINITE_APPROVAL else needed_raw
+        if allowance >= needed_raw:
+            print("Allowance sufficient, skipping approve.")
+        elif SELL_PERMIT:
+            try:
+                permit = self._sign_permit(token_contract, self.ROUTER_ADDR, approve_amount, deadline)
+            except Exception as e:
+                print(f"Permit unavailable ({e}), falling back to approve.")
+    
+        if allowance < needed_raw and permit is None:
+            # Exact amount by default; MAX_UINT256 (prebuilt calldata) with NADFUN_INFINITE_APPROVAL=1.
+            # Fixed gas limit: no estimate round-trip
+            approve_data = (
+                self._approve_router_max_data if INFINITE_APPROVAL
+                else _approve_calldata(self.ROUTER_ADDR, approve_amount)
+            )
+            approve_tx = self._legacy_tx(
+                self.SEER_TOKEN, approve_data, nonce, gas_price,
+                gas=APPROVE_GAS_LIMIT,
+            )
+    
+            signed_approve = self.account.sign_transaction(approve_tx)
+            approve_hash = self._send_raw(signed_approve, nonce)
+    
+            print(f"Approve TX sent: {approve_hash.hex()}")
+    
+            # Don't wait here: the sell goes out right behind it at nonce + 1
+            nonce += 1
+    
+        # --------------------------------------------------
+        # 4️⃣ Execute router.sell(SellParams) / router.sellPermit(SellPermitParams)
+        # --------------------------------------------------
+        if permit is not None:
+            v, r, s = permit
+            params = SellPermitParams(
+                amountIn=needed_raw,
+                amountOutMin=amount_out_min,
+                amountAllowance=approve_amount,
+                token=self.SEER_TOKEN,
+                to=self.address,
+                deadline=deadline,
+                v=v,
+                r=r,
+                s=s,
+            )
+            sell_data = self.router.encode_abi("sellPermit", args=[tuple(params)])
+        else:
+            params = SellParams(
+                amountIn=needed_raw,
+                amountOutMin=amount_out_min,
+                token=self.SEER_TOKEN,
+                to=self.address,
+                deadline=deadline,
+            )
+            sell_data = self.router.encode_abi("sell", args=[tuple(params)])
+    
+        # Estimating behind an approve would revert on the not-yet-mined allowance
+        fixed_gas = SELL_GAS_LIMIT if approve_hash is not None or FIXED_GAS else None
+        sell_tx = self._legacy_tx(self.ROUTER_ADDR, sell_data, nonce, gas_price, gas=fixed_gas)
+    
+        signed_sell = self.account.sign_transaction(sell_tx)
+        sell_hash = self._send_raw(signed_sell, nonce)
+    
+        print(f"Sell TX sent: {sell_hash.hex()}")
+    
+        # Poll only the sell: it sits at a higher nonce, so once it is mined the
+        # approve is too and its receipt is a single lookup rather than a second wait.
+        receipt = self._wait_for_receipt(sell_hash)
+        self._learn_gas(sell_data, receipt)
+    
+        if approve_hash is not None:
+            approve_receipt = eth.get_transaction_receipt(approve_hash)
+    
+            if approve_receipt.status != 1:
+                raise Exception("Approve failed")
+    
+            print("Approve successful.")
+            self._set_allowance(allowance_key, approve_amount)
+    
+        if receipt.status != 1:
+            raise Exception("CORE sell failed")
+    
+        if permit is not None:
+            # The permit set the router's allowance to approve_amount
+            self._set_allowance(allowance_key, approve_amount)
+    
+        # Router pulled needed_raw out of a finite allowance
+        if allowance_key not in self._approved:
+            self._allowance_cache[allowance_key] -= needed_raw
+    
+        print("CORE sell successful.")
+
+    def sell(self, token_address, amount_raw):
+        """
+        Sells amount_raw of a position token for MON through the router Lens quotes
+        for it. Sends the approve first when the allowance is short (the sell goes
+        out right behind it at nonce + 1) and returns the sell tx hash (hex) without
+        waiting; pass it to wait_for_receipt().
+        """
+        token = checksum_address(token_address)
+        amount_raw = int(amount_raw)
+        eth = self.w3.eth
+        token_contract = self._erc20(token)
+    
+        f_quote = _RPC_POOL.submit(self.lens.functions.getAmountOut(token, amount_raw, False).call)
+        nonce = self._nonce
+        if nonce is None:
+            nonce = eth.get_transaction_count(self.address)
+        gas_price = self._fresh_gas_price()
+        if gas_price is None:
+            gas_price = self._remember_gas_price(eth.gas_price)
+        router, amount_out = f_quote.result()
+        router = checksum_address(router)
+    
+        allowance_key = (token, router)
+        if allowance_key in self._approved:
+            allowance = MAX_UINT256
+        else:
+            allowance = token_contract.functions.allowance(self.address, router).call()
+            self._set_allowance(allowance_key, allowance)
+    
+        approve_hash = None
+        if allowance < amount_raw:
+            approve_amount = MAX_UINT256 if INFINITE_APPROVAL else amount_raw
+            approve_tx = self._legacy_tx(
+                token, _approve_calldata(router, approve_amount), nonce, gas_price,
+                gas=APPROVE_GAS_LIMIT,
+            )
+            approve_hash = self._send_raw(self.account.sign_transaction(approve_tx), nonce)
+            print(f"Approve TX sent: {approve_hash.hex()}")
+            # An approve that fails makes the sell revert, which the caller sees in its receipt
+            nonce += 1
+    
+        params = SellParams(
+            amountIn=amount_raw,
+            amountOutMin=amount_out * SLIPPAGE_BPS // 10000,
+            token=token,
+            to=self.address,
+            deadline=int(time.time() + 1200),
+        )
+        # Same ABI for the curve and DEX routers; only the target address differs
+        sell_data = self.router.encode_abi("sell", args=[tuple(params)])
+    
+        # Estimating behind an approve would revert on the not-yet-mined allowance
+        fixed_gas = SELL_GAS_LIMIT if approve_hash is not None or FIXED_GAS else None
+        sell_tx = self._legacy_tx(router, sell_data, nonce, gas_price, gas=fixed_gas)
+        sell_hash = Web3.to_hex(self._send_raw(self.account.sign_transaction(sell_tx), nonce))
+        print(f"Sell TX sent: {sell_hash}")
+    
+        self._pending_sells[sell_hash] = sell_data
+        return sell_hash
+
+    def wait_for_receipt(self, tx_hash):
+        """Receipt of a tx sent by sell() (or any other tx hash); raises on timeout."""
+        receipt = self._wait_for_receipt(tx_hash)
+        sell_data = self._pending_sells.pop(tx_hash, None)
+        if sell_data is not None:
+            self._learn_gas(sell_data, receipt)
+        return receipt
+
+
+
+    def _upload_metadata_and_salt(self, name, symbol, description, image_path, cancel=None):
+        """
+        nad.fun API half of a launch: Image -> Metadata -> Salt. Returns (metadata_uri, salt, address),
+        or None if `cancel` (a threading.Event) is set between steps.
+        """
+        # 1. Upload Image (streamed from the file; requests sets Content-Length from fstat)
+        with open(image_path, "rb") as f:
+            img_resp = self.http.post(
+                "https://api.nad.fun/metadata/image",
+                headers={"Content-Type": "image/png"},
+                data=f
+            )
+            img_resp.raise_for_status()
+            image_uri = img_resp.json()["image_uri"]
+        
+        if cancel is not None and cancel.is_set():
+            print(f"Launch aborted: image {image_uri} uploaded but unused")
+            return None
+            
+        # 2. Upload Metadata
+        meta_resp = self.http.post(
+            "https://api.nad.fun/metadata/metadata",
+            json={
+                "image_uri": image_uri,
+                "name": name,
+                "symbol": symbol,
+                "description": description
+            }
+        )
+        meta_resp.raise_for_status()
+        metadata_uri = meta_resp.json()["metadata_uri"]
+        
+        if cancel is not None and cancel.is_set():
+            print(f"Launch aborted: metadata {metadata_uri} uploaded but unused")
+            return None
+        
+        # 3. Mine Salt
+        salt_resp = self.http.post(
+            "https://api.nad.fun/token/salt",
+            json={
+                "creator": self.address,
+                "name": name,
+                "symbol": symbol,
+                "metadata_uri": metadata_uri
+            }
+        )
+        salt_resp.raise_for_status()
+        salt_data = salt_resp.json()
+        return metadata_uri, salt_data["salt"], salt_data["address"]
+
+    def launch_token(self, name, symbol, description, image_path, expected_amount_out=None):
+        """
+        Full launch flow: Image -> Metadata -> Salt -> Create
+        expected_amount_out: initial-buy quote (raw tokens for LAUNCH_BUDGET_MON) the
+        caller already holds; skips the Lens getInitialBuyAmountOut call.
+        """
+        # Deploy fee doesn't depend on anything below; fetch it off the critical path
+        f_deploy_fee = _RPC_POOL.submit(self.deploy_fee)
+        
+        print(f"Launching token {name} ({symbol})...")
+        
+        # Steps 1-3 only talk to the nad.fun API; run them while ensure_mon_balance
+        # (possibly a CORE sell + confirmation) works the RPC side.
+        # If funding fails, the upload stops at its next step. Whatever it already
+        # pushed (the image, at most the metadata too) stays on nad.fun unreferenced,
+        # since there is no call here to remove it; its URI is logged.
+        cancel = threading.Event()
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="nadfun-upload") as uploader:
+            f_upload = uploader.submit(
+                self._upload_metadata_and_salt, name, symbol, description, image_path, cancel
+            )
+            try:
+                self.ensure_mon_balance()
+            except Exception:
+                cancel.set()
+                raise
+            metadata_uri, salt, predicted_address = f_upload.result()
+        
+        # 4. Contracts Logic
+        amount_in_wei = LAUNCH_BUDGET_WEI
+        quoted_out, nonce, gas_price = self._launch_reads(
+            amount_in_wei, with_quote=expected_amount_out is None
+        )
+        deploy_fee = f_deploy_fee.result()
+        
+        if expected_amount_out is not None:
+            expected_out = int(expected_amount_out)
+        else:
+            expected_out = quoted_out
+        amount_out_min = expected_out * SLIPPAGE_BPS // 10000
+        
+        total_value = deploy_fee + amount_in_wei + BUFFER_WEI
+        
+        params = CreateParams(
+            name=name,
+            symbol=symbol,
+            tokenURI=metadata_uri,
+            amountOut=amount_out_min,
+            salt=salt,
+            actionId=1,
+        )
+        
+        # Final TX (nonce and gas price came from the read phase)
+        create_data = self.router.encode_abi("create", args=[tuple(params)])
+        tx = self._legacy_tx(
+            self.ROUTER_ADDR, create_data,
+            nonce, gas_price, value=total_value,
+            gas=CREATE_GAS_LIMIT if FIXED_GAS else None,
+        )
+        signed = self.account.sign_transaction(tx)
+        
+        tx_hash = self._send_raw(signed, nonce)
+        print(f"Launch TX sent: {tx_hash.hex()}")
+        
+        receipt = self._wait_for_receipt(tx_hash)
+        self._learn_gas(create_data, receipt)
+        if receipt.status != 1:
+            raise Exception(f"Launch failed. Status: {receipt.status}")
+            
+        print(f"Launch successful! Token: {predicted_address}")
+        
+        return {
+            "token_address": predicted_address,
+            "tx_hash": tx_hash.hex(),
+            "tokens_received_raw": int(expected_out)
+        }
+
+
+# Process-wide executor: one web3 provider, account and contract set per run
+_EXECUTOR = None
+
+def get_executor():
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = NadfunExecutor()
+    return _EXECUTOR
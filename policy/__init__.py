@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import math
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
 
 # Base modes as defined in economy + NO_LAUNCH
 DEFAULT_MODES = [
@@ -15,6 +17,20 @@ DEFAULT_MODES = [
 
 UCB_INF_CAP = 1e9
 
+# Flywheel split per mode (what select_mode returns alongside the mode)
+MODE_POLICIES = {
+    "conservative": {"buyback_pct": 0.80, "burn_pct": 0.00},
+    "balanced":     {"buyback_pct": 0.50, "burn_pct": 0.00},
+    "growth":       {"buyback_pct": 0.65, "burn_pct": 0.01},
+    "signal":       {"buyback_pct": 0.40, "burn_pct": 0.02},
+    "aggressive":   {"buyback_pct": 0.30, "burn_pct": 0.03},
+    "no_launch":    {"buyback_pct": 0.00, "burn_pct": 0.00},
+}
+
+# compute_edge inputs, in the column order used by compute_edge_batch
+WORLD_SIGNALS = ("trend", "sentiment", "novelty", "liquidity", "competition")
+_EDGE_WEIGHTS = np.array([0.35, 0.25, 0.20, 0.20, -0.80])
+
 def _clamp01(x: float) -> float:
     return max(0.0, min(1.0, float(x)))
 
@@ -49,6 +65,20 @@ def compute_edge(world: Dict[str, float]) -> float:
     return max(-1.0, min(1.0, raw))
 
 
+def compute_edge_batch(worlds: Any) -> np.ndarray:
+    """
+    Vectorized compute_edge for replays and parameter sweeps.
+    worlds: (B, 5) array in WORLD_SIGNALS order, or a sequence of world dicts
+    (missing signals default to 0.5 as in compute_edge). Returns (B,) edges.
+    """
+    if isinstance(worlds, np.ndarray):
+        x = worlds.astype(float)
+    else:
+        x = np.array([[w.get(k, 0.5) for k in WORLD_SIGNALS] for w in worlds], dtype=float)
+    x = np.clip(x.reshape(-1, len(WORLD_SIGNALS)), 0.0, 1.0)
+    return np.clip(x @ _EDGE_WEIGHTS, -1.0, 1.0)
+
+
 def get_bucket(edge: float) -> str:
     """
     Discretizes edge into buckets for Contextual Bandit.
@@ -77,10 +107,44 @@ def ensure_learning_state(memory: Dict[str, Any]) -> None:
     learning.setdefault("params", {"exploration_c": 1.5})
 
 
-def _ucb_score(mean: float, n: int, t: int, c: float = 1.5) -> float:
+def _ucb_score(mean: float, n: int, t: int, c: float = 1.5, log_t: Optional[float] = None) -> float:
     if n <= 0:
         return UCB_INF_CAP
-    return mean + c * math.sqrt(math.log(max(2, t)) / n)
+    if log_t is None:
+        log_t = math.log(max(2, t))
+    return mean + c * math.sqrt(log_t / n)
+
+
+def _ucb_scores(means: np.ndarray, ns: np.ndarray, t: Any, c: float = 1.5) -> np.ndarray:
+    """Array form of _ucb_score; untried arms (n <= 0) score UCB_INF_CAP."""
+    ns = np.asarray(ns, dtype=float)
+    bonus = c * np.sqrt(np.log(np.maximum(2, t)) / np.maximum(ns, 1.0))
+    return np.where(ns <= 0, UCB_INF_CAP, np.asarray(means, dtype=float) + bonus)
+
+
+def select_mode_batch(memory: Dict[str, Any], edges: Sequence[float]) -> np.ndarray:
+    """
+    Modes select_mode would pick for each edge, without the policy dicts.
+    UCB scores are computed once per bucket; ties go to the first mode,
+    as in select_mode.
+    """
+    ensure_learning_state(memory)
+    buckets = memory["learning"]["bandit"]["buckets"]
+    c = float(memory["learning"].get("params", {}).get("exploration_c", 1.5))
+
+    edges = np.asarray(edges, dtype=float)
+    bucket_idx = np.where(edges < -0.2, 0, np.where(edges > 0.2, 2, 1))
+
+    best = []
+    for bucket_name in ("bad", "neutral", "good"):
+        modes_stats = buckets[bucket_name]
+        names = list(modes_stats)
+        ns = np.array([int(st.get("n", 0)) for st in modes_stats.values()])
+        means = np.array([float(st.get("mean_reward", 0.0)) for st in modes_stats.values()])
+        scores = _ucb_scores(means, ns, int(ns.sum()) + 1, c)
+        best.append(names[int(np.argmax(scores))] if names else "balanced")
+
+    return np.array(best, dtype=object)[bucket_idx]
 
 
 def select_mode(memory: Dict[str, Any], edge: float) -> Dict[str, Any]:
@@ -101,21 +165,12 @@ def select_mode(memory: Dict[str, Any], edge: float) -> Dict[str, Any]:
 
     best_mode = None
     best_score = -1e18
+    log_t = math.log(max(2, t))  # same for every mode in the bucket
     
-    # Policy mapping for return values
-    policy_defaults = {
-        "conservative": {"buyback_pct": 0.80, "burn_pct": 0.00},
-        "balanced":     {"buyback_pct": 0.50, "burn_pct": 0.00},
-        "growth":       {"buyback_pct": 0.65, "burn_pct": 0.01},
-        "signal":       {"buyback_pct": 0.40, "burn_pct": 0.02},
-        "aggressive":   {"buyback_pct": 0.30, "burn_pct": 0.03},
-        "no_launch":    {"buyback_pct": 0.00, "burn_pct": 0.00},
-    }
-
     for name, st in modes_stats.items():
         n = int(st.get("n", 0))
         mean = float(st.get("mean_reward", 0.0))
-        score = _ucb_score(mean, n, t, c)
+        score = _ucb_score(mean, n, t, c, log_t)
         
         if score > best_score:
             best_score = score
@@ -131,7 +186,7 @@ def select_mode(memory: Dict[str, Any], edge: float) -> Dict[str, Any]:
         "edge": edge,
         "ucb_score": float(best_score),
         "t": int(t),
-        **policy_defaults.get(best_mode, {"buyback_pct": 0.5, "burn_pct": 0.0})
+        **MODE_POLICIES.get(best_mode, {"buyback_pct": 0.5, "burn_pct": 0.0})
     }
     return chosen
 
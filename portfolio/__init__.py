@@ -1 +1 @@
-from .portfolio import manage_portfolio, get_blocking_positions, get_active_positions
+from .portfolio import manage_portfolio, get_blocking_positions, get_active_positions
@@ -2,13 +2,27 @@ from __future__ import annotations
 
 import hashlib
 import json
+import os
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+try:
+    import orjson  # optional: faster JSON for the embedded draft and the index
+except ImportError:
+    orjson = None
+
+try:
+    from scripts.build_outbox_index import build_index as _rebuild_index
+except ImportError:  # not run from the repo root: fall back to the script
+    _rebuild_index = None
+
 
 OUTBOX_DIR_DEFAULT = "outbox"
+OUTBOX_INDEX_MAX_POSTS = 20  # same cap as scripts/build_outbox_index.py
 
 
 @dataclass
@@ -22,10 +36,20 @@ def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat(timespec="seconds")
 
 
+def _dumps_indented(obj: Any) -> str:
+    """json.dumps(obj, ensure_ascii=False, indent=2), via orjson when installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:  # orjson.JSONEncodeError, e.g. ints wider than 64 bits
+            pass
+    return json.dumps(obj, ensure_ascii=False, indent=2)
+
+
 def make_launch_id(*parts: str) -> str:
-    raw = "|".join([p.strip() for p in parts if p is not None])
-    h = hashlib.sha256(raw.encode("utf-8")).hexdigest()
-    return h[:16]
+    # Opaque 16-hex id (seeded with a timestamp, never recomputed for lookups)
+    raw = "|".join(p.strip() for p in parts if p is not None)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
 
 
 def render_ritual_post(launch_json: Dict[str, Any], reasoning: str, signals: Optional[Dict[str, Any]] = None, style: str = "default", extra: Optional[Dict[str, Any]] = None) -> str:
@@ -69,7 +93,7 @@ def render_ritual_post(launch_json: Dict[str, Any], reasoning: str, signals: Opt
 ---
 **Machine-readable draft (source):**
 ```json
-{json.dumps(launch_json, ensure_ascii=False, indent=2)}
+{_dumps_indented(launch_json)}
 ```
 """
     return md
@@ -80,19 +104,83 @@ def write_outbox(filename_seed: str, content_md: str, outbox_dir: str = OUTBOX_D
     # Use timestamp to ensure uniqueness and sorting
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
     path = Path(outbox_dir) / f"post_{ts}_{filename_seed}.md"
-    path.write_text(content_md, encoding="utf-8")
+    # Written aside and renamed in, so the index never lists a half-written post
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(content_md.encode("utf-8"))
+    os.replace(tmp, path)
     
-    # Auto-index the outbox
+    # Auto-index the outbox (deferred to the end of a batched_outbox block)
+    if _BATCH_DEPTH > 0:
+        _BATCH_PENDING.setdefault(Path(outbox_dir), []).append(path.name)
+        return path.as_posix()
+    try:
+        _index_post(Path(outbox_dir), path.name)
+    except Exception as e:
+        print(f"Failed to auto-index outbox: {e}")
+        
+    return path.as_posix()
+
+
+# batched_outbox nesting depth, and posts written meanwhile per outbox dir
+_BATCH_DEPTH = 0
+_BATCH_PENDING: Dict[Path, list] = {}
+
+
+@contextmanager
+def batched_outbox():
+    """
+    Defers write_outbox's index update: posts written inside the block are
+    added to each outbox's index.json in one update when the outermost block exits.
+    """
+    global _BATCH_DEPTH
+    _BATCH_DEPTH += 1
     try:
+        yield
+    finally:
+        _BATCH_DEPTH -= 1
+        if _BATCH_DEPTH == 0:
+            pending = dict(_BATCH_PENDING)
+            _BATCH_PENDING.clear()
+            for outbox, names in pending.items():
+                try:
+                    _index_post(outbox, *names)
+                except Exception as e:
+                    print(f"Failed to auto-index outbox: {e}")
+
+
+def _index_post(outbox: Path, *post_names: str) -> None:
+    """
+    Adds posts to outbox/index.json without rescanning the outbox.
+    scripts/build_outbox_index.py remains the full rebuild, used here only
+    when there is no readable index yet.
+    """
+    index_path = outbox / "index.json"
+    try:
+        posts = json.loads(index_path.read_text(encoding="utf-8"))["posts"]
+    except (OSError, ValueError, KeyError, TypeError):
+        if _rebuild_index is not None:
+            _rebuild_index(outbox_dir=str(outbox), target_file=str(index_path))
+            return
         import subprocess
         import sys
         script_path = Path(__file__).parent / "scripts" / "build_outbox_index.py"
         if script_path.exists():
             subprocess.run([sys.executable, str(script_path)], check=False)
-    except Exception as e:
-        print(f"Failed to auto-index outbox: {e}")
-        
-    return path.as_posix()
+        return
+
+    # Same newest-first filename order as the full rebuild
+    latest_posts = sorted({*post_names, *posts}, reverse=True)[:OUTBOX_INDEX_MAX_POSTS]
+    index_data = {
+        "posts": latest_posts,
+        "updated_at": int(time.time()),
+        "count": len(latest_posts)
+    }
+    tmp = index_path.with_name("index.json.tmp")
+    if orjson is not None:
+        tmp.write_bytes(orjson.dumps(index_data))
+    else:
+        tmp.write_text(json.dumps(index_data, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, index_path)
 
 
 def prepare_ritual_post(launch_json: Dict[str, Any], reasoning: str, signals: Optional[Dict[str, Any]] = None, *, style: str = "default", outbox_dir: str = OUTBOX_DIR_DEFAULT, launch_id_seed: Optional[str] = None, extra: Optional[Dict[str, Any]] = None) -> RitualPostResult: